@@ -5,43 +5,225 @@ This module defines all REST API endpoints for the Retail Chain Inventory Tracke
 Handles authentication, inventory operations, and reporting endpoints.
 """
 
-from flask import Blueprint, request, jsonify, session
-from datetime import datetime
+from flask import Blueprint, Response, current_app, g, request, jsonify, session, stream_with_context
+from functools import wraps
+from datetime import timezone
+import hashlib
+import hmac
+import ciso8601
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import selectinload
 from services.inventory_service import InventoryService
+from socketio_events import (
+    broadcast_inventory_update,
+    broadcast_inventory_bulk_update,
+    broadcast_transfer_update,
+)
 from models import db, User, Store, Product, InventoryItem, Transaction
+from cache import cache
 
 api = Blueprint('api', __name__, url_prefix='/api')
 
 
-def require_auth():
-    """Decorator to require authentication for API endpoints"""
-    if 'user_id' not in session:
-        return jsonify({'error': 'Authentication required'}), 401
-    return None
+@cache.memoize(timeout=60)
+def _user_json(user_id):
+    """Serialized user for the auth status endpoint, cached per user id"""
+    user = db.session.get(User, user_id)
+    return user.to_dict() if user else None
+
+
+def invalidate_user_cache(user_id):
+    """Drop the cached serialized user after login, logout or permission changes"""
+    cache.delete_memoized(_user_json, user_id)
+
+
+# Cache keys for rarely-changing listing responses
+STORES_CACHE_KEY = 'api:stores'
+PRODUCTS_CACHE_KEY = 'api:products'
+DASHBOARD_CACHE_KEY = 'api:dashboard'
+TX_LATEST_CACHE_KEY = 'tx:latest'
+# Transactions returned per /changes poll
+CHANGES_PAGE_SIZE = 100
+# Low-stock responses are cached per store under a version number; bumping
+# it retires every store's entry at once
+LOW_STOCK_VERSION_KEY = 'api:low_stock:version'
+
+
+def _cached_json_response(key, build, timeout=60):
+    """
+    Serve a JSON payload from the cache with an ETag
+    
+    On a miss build() is called and its serialized result stored under key.
+    Clients sending a matching If-None-Match receive a bodyless 304.
+    """
+    cached = cache.get(key)
+    if cached is None:
+        payload = current_app.json.dumps(build())
+        cached = (payload, hashlib.md5(payload.encode('utf-8')).hexdigest())
+        cache.set(key, cached, timeout=timeout)
+    
+    payload, etag = cached
+    response = current_app.response_class(payload, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
+def _low_stock_cache_key(store_id, limit=None):
+    """Cache key for one store's (or the whole chain's) low-stock list"""
+    version = cache.get(LOW_STOCK_VERSION_KEY) or 0
+    return f"api:low_stock:{version}:{store_id or 'all'}:{limit or 'all'}"
+
+
+def _bump_low_stock_version():
+    """Retire all cached low-stock lists (atomic INCR on Redis)"""
+    cache.cache.inc(LOW_STOCK_VERSION_KEY)
+
+
+def invalidate_product_cache():
+    """Drop cached responses that depend on the product catalogue"""
+    cache.delete_many(PRODUCTS_CACHE_KEY, DASHBOARD_CACHE_KEY)
+    _bump_low_stock_version()
+
+
+def invalidate_inventory_cache():
+    """Drop cached responses that depend on stock levels or transactions"""
+    cache.delete_many(DASHBOARD_CACHE_KEY, TX_LATEST_CACHE_KEY)
+    _bump_low_stock_version()
+
+
+def _latest_transaction_cursor():
+    """Newest transaction's (timestamp, id), cached briefly so polling stays cheap"""
+    latest = cache.get(TX_LATEST_CACHE_KEY)
+    if latest is None:
+        row = db.session.execute(
+            select(Transaction.timestamp, Transaction.id)
+            .order_by(Transaction.timestamp.desc(), Transaction.id.desc())
+            .limit(1)
+        ).first()
+        latest = tuple(row) if row else None
+        cache.set(TX_LATEST_CACHE_KEY, latest, timeout=2)
+    return latest
+
+
+def _parse_timestamp(value):
+    """
+    Parse an ISO 8601 query parameter into a naive UTC datetime
+    
+    Uses the C-backed ciso8601 parser; offset-aware values are converted to
+    UTC so they compare correctly with the naive UTC timestamps in the DB.
+    
+    Raises:
+        ValueError: If the value is not a valid ISO 8601 timestamp
+    """
+    parsed = ciso8601.parse_datetime(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _json_array_stream(items):
+    """Yield a JSON array one element at a time so large listings never sit in memory"""
+    dumps = current_app.json.dumps
+    yield '['
+    for index, item in enumerate(items):
+        if index:
+            yield ','
+        yield dumps(item, separators=(',', ':'))
+    yield ']'
+
+
+def _stream_json_array(items):
+    """Build a streaming JSON array response for an iterable of dicts"""
+    return Response(stream_with_context(_json_array_stream(items)), mimetype='application/json')
+
+
+# Successful password verifications are remembered for this long so repeat
+# logins skip the (deliberately slow) password KDF
+AUTH_CACHE_TTL = 300
+# Failed logins allowed per client address within AUTH_CACHE_TTL
+LOGIN_ATTEMPT_LIMIT = 10
+
+# Upper bound on items accepted by /inventory/bulk_update
+BULK_UPDATE_LIMIT = 500
+
+
+def _auth_cache_key(user, password):
+    """Cache key for a verified credential pair, keyed with the app secret"""
+    digest = hmac.new(
+        current_app.config['SECRET_KEY'].encode('utf-8'),
+        f"{user.password_hash}:{password}".encode('utf-8'),
+        hashlib.sha256
+    ).hexdigest()
+    return f"auth:{user.username}:{digest}"
+
+
+def _verify_password(user, password):
+    """Check a password, skipping the KDF if the same credentials verified recently"""
+    key = _auth_cache_key(user, password)
+    if cache.get(key):
+        return True
+    if user.check_password(password):
+        cache.set(key, True, timeout=AUTH_CACHE_TTL)
+        return True
+    return False
+
+
+def login_user(username, password):
+    """
+    Authenticate credentials and start a session
+    
+    Shared by the JSON API login and the legacy form login in app.py.
+    Returns a Flask response (or response, status tuple).
+    """
+    attempts_key = f"login_failures:{request.remote_addr}"
+    failed_attempts = cache.get(attempts_key) or 0
+    if failed_attempts >= LOGIN_ATTEMPT_LIMIT:
+        return jsonify({'error': 'Too many failed login attempts. Try again later'}), 429
+    
+    user = User.get_by_username(username)
+    if user and _verify_password(user, password):
+        cache.delete(attempts_key)
+        invalidate_user_cache(user.id)
+        session['user_id'] = user.id
+        session['username'] = user.username
+        session['role'] = user.role
+        return jsonify({
+            'message': 'Login successful',
+            'user': user.to_dict()
+        })
+    
+    cache.set(attempts_key, failed_attempts + 1, timeout=AUTH_CACHE_TTL)
+    return jsonify({'error': 'Invalid credentials'}), 401
+
+
+def login_required(f):
+    """Decorator to require authentication; stashes the session user on g"""
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        user_id = session.get('user_id')
+        if not user_id:
+            return jsonify({'error': 'Authentication required'}), 401
+        g.user_id = user_id
+        g.role = session.get('role')
+        return f(*args, **kwargs)
+    return wrapper
 
 
 def require_admin():
-    """Require the current session user to be an admin"""
-    auth_error = require_auth()
-    if auth_error:
-        return auth_error
-    if session.get('role') != 'admin':
+    """Require the current user to be an admin (inside @login_required views)"""
+    if g.role != 'admin':
         return jsonify({'error': 'Admin privileges required'}), 403
     return None
 
 
 def require_permission(permission):
-    """Check if user has specific permission or is admin"""
-    auth_error = require_auth()
-    if auth_error:
-        return auth_error
-    
+    """Check if user has specific permission or is admin (inside @login_required views)"""
     # Admin bypasses all permission checks
-    if session.get('role') == 'admin':
+    if g.role == 'admin':
         return None
     
     # Get user and check permissions
-    user = User.query.get(session['user_id'])
+    user = db.session.get(User, g.user_id)
     if not user:
         return jsonify({'error': 'User not found'}), 401
     
@@ -60,18 +242,8 @@ def login():
         if not data or 'username' not in data or 'password' not in data:
             return jsonify({'error': 'Username and password required'}), 400
         
-        user = User.query.filter_by(username=data['username']).first()
-        if user and user.check_password(data['password']):
-            session['user_id'] = user.id
-            session['username'] = user.username
-            session['role'] = user.role
-            return jsonify({
-                'message': 'Login successful',
-                'user': user.to_dict()
-            })
-        else:
-            return jsonify({'error': 'Invalid credentials'}), 401
-            
+        return login_user(data['username'], data['password'])
+        
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -79,6 +251,8 @@ def login():
 @api.route('/auth/logout', methods=['POST'])
 def logout():
     """Clear user session"""
+    if 'user_id' in session:
+        invalidate_user_cache(session['user_id'])
     session.clear()
     return jsonify({'message': 'Logout successful'})
 
@@ -88,10 +262,10 @@ def auth_status():
     """Get current authentication status"""
     if 'user_id' in session:
         try:
-            user = User.query.get(session['user_id'])
+            user_data = _user_json(session['user_id'])
             return jsonify({
                 'authenticated': True,
-                'user': user.to_dict() if user else {
+                'user': user_data if user_data else {
                     'user_id': session['user_id'],
                     'username': session.get('username'),
                     'role': session.get('role')
@@ -104,21 +278,18 @@ def auth_status():
 
 
 @api.route('/stores', methods=['GET'])
+@login_required
 def get_stores():
     """Get all stores"""
-    auth_error = require_auth()
-    if auth_error:
-        return auth_error
-    
     try:
-        service = InventoryService(user_id=session['user_id'])
-        stores = service.get_stores()
-        return jsonify([store.to_dict() for store in stores])
+        service = InventoryService(user_id=g.user_id)
+        return _cached_json_response(STORES_CACHE_KEY, service.get_stores_raw)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @api.route('/users', methods=['GET'])
+@login_required
 def list_users():
     """List all users (admin only)"""
     admin_error = require_admin()
@@ -126,13 +297,25 @@ def list_users():
         return admin_error
 
     try:
-        users = User.query.all()
-        return jsonify([u.to_dict() for u in users])
+        rows = db.session.execute(
+            select(User.id, User.username, User.role, User.created_at, User.permissions)
+        ).all()
+        return jsonify([
+            {
+                'id': row.id,
+                'username': row.username,
+                'role': row.role,
+                'created_at': row.created_at,
+                'permissions': User.parse_permissions(row.permissions)
+            }
+            for row in rows
+        ])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @api.route('/users/<int:user_id>/permissions', methods=['PUT'])
+@login_required
 def update_user_permissions(user_id):
     """Update a user's permissions (admin only)
 
@@ -154,6 +337,7 @@ def update_user_permissions(user_id):
         perms = data.get('permissions')
         user.set_permissions(perms)
         db.session.commit()
+        invalidate_user_cache(user_id)
         return jsonify(user.to_dict())
     except Exception as e:
         db.session.rollback()
@@ -161,18 +345,14 @@ def update_user_permissions(user_id):
 
 
 @api.route('/products', methods=['GET', 'POST'])
+@login_required
 def handle_products():
     """Get all products or create a new product"""
-    auth_error = require_auth()
-    if auth_error:
-        return auth_error
-    
-    service = InventoryService(user_id=session['user_id'])
+    service = InventoryService(user_id=g.user_id)
     
     if request.method == 'GET':
         try:
-            products = service.get_products()
-            return jsonify([product.to_dict() for product in products])
+            return _cached_json_response(PRODUCTS_CACHE_KEY, service.get_products_raw)
         except Exception as e:
             return jsonify({'error': str(e)}), 500
     
@@ -200,6 +380,7 @@ def handle_products():
                 unit_cost=data.get('unit_cost', 0.0),
                 selling_price=data.get('selling_price', 0.0)
             )
+            invalidate_product_cache()
             
             return jsonify(product.to_dict()), 201
             
@@ -210,13 +391,10 @@ def handle_products():
 
 
 @api.route('/products/<int:product_id>', methods=['PUT', 'DELETE'])
+@login_required
 def handle_product(product_id):
     """Update or delete a specific product"""
-    auth_error = require_auth()
-    if auth_error:
-        return auth_error
-    
-    service = InventoryService(user_id=session['user_id'])
+    service = InventoryService(user_id=g.user_id)
     
     if request.method == 'PUT':
         # Require 'products' permission to update
@@ -230,6 +408,7 @@ def handle_product(product_id):
                 return jsonify({'error': 'JSON data required'}), 400
             
             product = service.update_product(product_id, **data)
+            invalidate_product_cache()
             return jsonify(product.to_dict())
             
         except ValueError as e:
@@ -250,6 +429,7 @@ def handle_product(product_id):
             
             db.session.delete(product)
             db.session.commit()
+            invalidate_product_cache()
             return jsonify({'message': 'Product deleted successfully'})
             
         except Exception as e:
@@ -258,34 +438,26 @@ def handle_product(product_id):
 
 
 @api.route('/inventory', methods=['GET'])
+@login_required
 def get_inventory():
     """Get inventory for a specific store or all stores"""
-    auth_error = require_auth()
-    if auth_error:
-        return auth_error
-    
     try:
         store_id = request.args.get('store_id', type=int)
-        service = InventoryService(user_id=session['user_id'])
-        
-        if store_id:
-            inventory_items = service.get_inventory_for_store(store_id)
-        else:
-            inventory_items = InventoryItem.query.all()
+        limit = request.args.get('limit', type=int)
+        offset = request.args.get('offset', type=int)
+        service = InventoryService(user_id=g.user_id)
         
-        return jsonify([item.to_dict() for item in inventory_items])
+        items = service.iter_inventory_raw(store_id=store_id, limit=limit, offset=offset)
+        return _stream_json_array(items)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @api.route('/inventory/update', methods=['POST'])
+@login_required
 def update_inventory():
     """Update inventory quantity for a product in a store"""
-    auth_error = require_auth()
-    if auth_error:
-        return auth_error
-    
     # Require 'inventory' permission to update stock
     perm_error = require_permission('inventory')
     if perm_error:
@@ -301,13 +473,77 @@ def update_inventory():
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        service = InventoryService(user_id=session['user_id'])
+        service = InventoryService(user_id=g.user_id)
         result = service.update_stock(
             store_id=data['store_id'],
             product_id=data['product_id'],
             delta=data['delta'],
             reason=data.get('reason', 'Manual update')
         )
+        invalidate_inventory_cache()
+        
+        # Broadcast the update via SocketIO off the request thread
+        socketio = current_app.extensions['socketio']
+        socketio.start_background_task(
+            broadcast_inventory_update,
+            socketio=socketio,
+            product_id=result['inventory_item']['product_id'],
+            store_id=result['inventory_item']['store_id'],
+            new_qty=result['new_quantity'],
+            transaction_id=result['transaction_id'],
+            timestamp=result['timestamp']
+        )
+        
+        return jsonify(result)
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@api.route('/inventory/bulk_update', methods=['POST'])
+@login_required
+def bulk_update_inventory():
+    """Apply a list of inventory updates with one write and one broadcast"""
+    perm_error = require_permission('inventory')
+    if perm_error:
+        return perm_error
+    
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'JSON data required'}), 400
+        
+        items = data.get('items')
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'items must be a non-empty list'}), 400
+        if len(items) > BULK_UPDATE_LIMIT:
+            return jsonify({'error': f'At most {BULK_UPDATE_LIMIT} items per request'}), 400
+        
+        required_fields = ['store_id', 'product_id', 'delta']
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                return jsonify({'error': f'Item {index} must be an object'}), 400
+            for field in required_fields:
+                if field not in item:
+                    return jsonify({'error': f'Item {index}: missing required field: {field}'}), 400
+        
+        service = InventoryService(user_id=g.user_id)
+        result = service.bulk_update_stock(
+            items,
+            reason=data.get('reason', 'Bulk update')
+        )
+        invalidate_inventory_cache()
+        
+        # One consolidated broadcast instead of one per item
+        socketio = current_app.extensions['socketio']
+        socketio.start_background_task(
+            broadcast_inventory_bulk_update,
+            socketio=socketio,
+            items=result['items'],
+            timestamp=result['timestamp']
+        )
         
         return jsonify(result)
         
@@ -318,12 +554,9 @@ def update_inventory():
 
 
 @api.route('/inventory/transfer', methods=['POST'])
+@login_required
 def transfer_inventory():
     """Transfer inventory between stores"""
-    auth_error = require_auth()
-    if auth_error:
-        return auth_error
-    
     # Require 'inventory' permission to transfer stock
     perm_error = require_permission('inventory')
     if perm_error:
@@ -339,7 +572,7 @@ def transfer_inventory():
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        service = InventoryService(user_id=session['user_id'])
+        service = InventoryService(user_id=g.user_id)
         result = service.transfer_stock(
             from_store_id=data['from_store'],
             to_store_id=data['to_store'],
@@ -347,6 +580,20 @@ def transfer_inventory():
             quantity=data['quantity'],
             reason=data.get('reason', 'Stock transfer')
         )
+        invalidate_inventory_cache()
+        
+        # Broadcast the transfer update via SocketIO off the request thread
+        socketio = current_app.extensions['socketio']
+        socketio.start_background_task(
+            broadcast_transfer_update,
+            socketio=socketio,
+            from_store_id=result['from_store']['inventory_item']['store_id'],
+            to_store_id=result['to_store']['inventory_item']['store_id'],
+            product_id=result['from_store']['inventory_item']['product_id'],
+            quantity=data['quantity'],
+            transaction_data=result,
+            timestamp=result['timestamp']
+        )
         
         return jsonify(result)
         
@@ -357,33 +604,26 @@ def transfer_inventory():
 
 
 @api.route('/reports/dashboard', methods=['GET'])
+@login_required
 def get_dashboard_kpis():
     """Get dashboard KPIs and metrics"""
-    auth_error = require_auth()
-    if auth_error:
-        return auth_error
-    
     # Require 'reports' permission to view dashboard
     perm_error = require_permission('reports')
     if perm_error:
         return perm_error
     
     try:
-        service = InventoryService(user_id=session['user_id'])
-        kpis = service.get_dashboard_kpis()
-        return jsonify(kpis)
+        service = InventoryService(user_id=g.user_id)
+        return _cached_json_response(DASHBOARD_CACHE_KEY, service.get_dashboard_kpis, timeout=30)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @api.route('/reports/low-stock', methods=['GET'])
+@login_required
 def get_low_stock():
     """Get items with low stock levels"""
-    auth_error = require_auth()
-    if auth_error:
-        return auth_error
-    
     # Require 'reports' permission to view low stock
     perm_error = require_permission('reports')
     if perm_error:
@@ -391,21 +631,22 @@ def get_low_stock():
     
     try:
         store_id = request.args.get('store_id', type=int)
-        service = InventoryService(user_id=session['user_id'])
-        low_stock_items = service.get_low_stock_items(store_id=store_id)
-        return jsonify(low_stock_items)
+        limit = request.args.get('limit', type=int)
+        service = InventoryService(user_id=g.user_id)
+        return _cached_json_response(
+            _low_stock_cache_key(store_id, limit),
+            lambda: service.get_low_stock_items(store_id=store_id, limit=limit),
+            timeout=30
+        )
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @api.route('/reports/stock', methods=['GET'])
+@login_required
 def get_stock_report():
     """Generate stock movement report"""
-    auth_error = require_auth()
-    if auth_error:
-        return auth_error
-    
     # Require 'reports' permission to generate stock report
     perm_error = require_permission('reports')
     if perm_error:
@@ -417,20 +658,28 @@ def get_stock_report():
         end_date = None
         
         if request.args.get('start_date'):
-            start_date = datetime.fromisoformat(request.args.get('start_date'))
+            start_date = _parse_timestamp(request.args.get('start_date'))
         if request.args.get('end_date'):
-            end_date = datetime.fromisoformat(request.args.get('end_date'))
+            end_date = _parse_timestamp(request.args.get('end_date'))
         
         store_id = request.args.get('store_id', type=int)
         
-        service = InventoryService(user_id=session['user_id'])
+        service = InventoryService(user_id=g.user_id)
         report = service.generate_stock_report(
             start_date=start_date,
             end_date=end_date,
             store_id=store_id
         )
+        transactions = report.pop('transactions')
         
-        return jsonify(report)
+        def generate():
+            # Emit the aggregate sections first, then splice the streamed
+            # transaction array in as the final key of the same object
+            yield current_app.json.dumps(report, separators=(',', ':'))[:-1] + ',"transactions":'
+            yield from _json_array_stream(transactions)
+            yield '}'
+        
+        return Response(stream_with_context(generate()), mimetype='application/json')
         
     except ValueError as e:
         return jsonify({'error': f'Invalid date format: {str(e)}'}), 400
@@ -439,12 +688,9 @@ def get_stock_report():
 
 
 @api.route('/transactions', methods=['GET'])
+@login_required
 def get_transactions():
     """Get recent transactions"""
-    auth_error = require_auth()
-    if auth_error:
-        return auth_error
-    
     # Require 'transactions' permission to view transaction history
     perm_error = require_permission('transactions')
     if perm_error:
@@ -452,53 +698,99 @@ def get_transactions():
     
     try:
         limit = request.args.get('limit', 50, type=int)
+        offset = request.args.get('offset', type=int)
         store_id = request.args.get('store_id', type=int)
         
-        service = InventoryService(user_id=session['user_id'])
-        transactions = service.get_recent_transactions(limit=limit, store_id=store_id)
-        
-        return jsonify([transaction.to_dict() for transaction in transactions])
+        service = InventoryService(user_id=g.user_id)
+        transactions = service.iter_transactions_raw(limit=limit, offset=offset, store_id=store_id)
+        return _stream_json_array(transactions)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @api.route('/changes', methods=['GET'])
+@login_required
 def get_changes():
-    """Get recent inventory changes for polling fallback"""
-    auth_error = require_auth()
-    if auth_error:
-        return auth_error
+    """
+    Get recent inventory changes for polling fallback
     
+    The cursor is the (timestamp, since_id) pair of the newest change served;
+    a bulk update stamps up to 500 rows with one timestamp, so the timestamp
+    alone cannot say where a page stopped. Pages run oldest-first from the
+    cursor and 'has_more' tells the client to poll again straight away.
+    A 'since' without 'since_id' returns everything after that instant.
+    """
     try:
         since_param = request.args.get('since')
         if not since_param:
             return jsonify({'error': 'since parameter required'}), 400
         
-        since_timestamp = datetime.fromisoformat(since_param)
+        since_id = request.args.get('since_id')
+        if since_id is not None:
+            if not since_id.isdigit():
+                return jsonify({'error': 'since_id must be an integer'}), 400
+            since_id = int(since_id)
         
-        # Get transactions since the specified timestamp
-        transactions = Transaction.query.filter(
-            Transaction.timestamp > since_timestamp
-        ).order_by(Transaction.timestamp.desc()).limit(100).all()
+        since_timestamp = _parse_timestamp(since_param)
+        
+        # Nothing new since the client's last poll: skip building the response
+        latest = _latest_transaction_cursor()
+        if latest is None:
+            return '', 304
+        if since_id is None:
+            if latest[0] <= since_timestamp:
+                return '', 304
+            after_cursor = Transaction.timestamp > since_timestamp
+        else:
+            if latest <= (since_timestamp, since_id):
+                return '', 304
+            after_cursor = tuple_(Transaction.timestamp, Transaction.id) > tuple_(since_timestamp, since_id)
+        
+        # Get the next page of transactions after the cursor (one extra row
+        # to tell whether more follow), loading the relationships used by
+        # to_dict() up front
+        transactions = Transaction.query.options(
+            selectinload(Transaction.product),
+            selectinload(Transaction.store),
+            selectinload(Transaction.related_store),
+            selectinload(Transaction.user)
+        ).filter(
+            after_cursor
+        ).order_by(Transaction.timestamp, Transaction.id).limit(CHANGES_PAGE_SIZE + 1).all()
+        has_more = len(transactions) > CHANGES_PAGE_SIZE
+        # Newest first, as before
+        transactions = transactions[:CHANGES_PAGE_SIZE][::-1]
+        
+        # Fetch the current inventory rows for all touched store/product
+        # pairs in a single query
+        pairs = {(t.store_id, t.product_id) for t in transactions}
+        quantities = {}
+        if pairs:
+            inventory_items = InventoryItem.query.filter(
+                tuple_(InventoryItem.store_id, InventoryItem.product_id).in_(pairs)
+            ).all()
+            quantities = {
+                (item.store_id, item.product_id): item.quantity
+                for item in inventory_items
+            }
         
         changes = []
         for transaction in transactions:
-            # Get current inventory item to include current quantity
-            inventory_item = InventoryItem.query.filter_by(
-                store_id=transaction.store_id,
-                product_id=transaction.product_id
-            ).first()
-            
             change = {
                 'transaction': transaction.to_dict(),
-                'current_quantity': inventory_item.quantity if inventory_item else 0
+                'current_quantity': quantities.get((transaction.store_id, transaction.product_id), 0)
             }
             changes.append(change)
         
+        # The newest change served (naive UTC, like the stored timestamps) is
+        # the next poll's cursor, so the 304 check compares like with like
+        cursor = (transactions[0].timestamp, transactions[0].id) if transactions else latest
         return jsonify({
             'changes': changes,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': cursor[0],
+            'since_id': cursor[1],
+            'has_more': has_more
         })
         
     except ValueError as e:
@@ -6,17 +6,20 @@ Configures Flask, SQLAlchemy, SocketIO, and registers blueprints.
 """
 
 import os
-from flask import Flask, session, request, jsonify, send_from_directory, send_file
-from flask_sqlalchemy import SQLAlchemy
+from flask import Flask, request, jsonify, send_from_directory
 from flask_socketio import SocketIO
-from datetime import datetime
+from flask_session import Session
+from socketio import RedisManager
+from sqlalchemy.pool import StaticPool
 import logging
+import redis
 
 # Import models and components
-from models import db, User, Store, Product, InventoryItem, Transaction
-from api import api
-from socketio_events import init_socketio_events, broadcast_inventory_update, broadcast_transfer_update
-from services.inventory_service import InventoryService
+from models import db, ensure_column_defaults, ensure_indexes, is_memory_sqlite, warm_connection_pool
+from cache import cache
+from json_provider import OrjsonProvider, SocketIOJSON
+from api import api, login_user
+from socketio_events import init_socketio_events
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -24,6 +27,7 @@ logger = logging.getLogger(__name__)
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # Configuration
 app.config['SECRET_KEY'] = 'your-secret-key-change-this-in-production'
@@ -31,15 +35,87 @@ _db_path = os.path.join(os.path.dirname(__file__), 'instance', 'database.db')
 # Use absolute path for SQLite DB to avoid multiple DB files when launching from different CWDs
 _db_path_abs = os.path.abspath(_db_path)
 # SQLAlchemy expects a forward-slash path for sqlite URI on Windows
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{_db_path_abs.replace('\\', '/')}"
+_db_uri_path = _db_path_abs.replace('\\', '/')
+# DATABASE_URL overrides the on-disk database, e.g. 'sqlite://' for an
+# in-memory database in test scripts
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', f"sqlite:///{_db_uri_path}")
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+if is_memory_sqlite(app.config['SQLALCHEMY_DATABASE_URI']):
+    # An in-memory database only exists on its connection, so every session
+    # must share that one connection
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'poolclass': StaticPool,
+        'connect_args': {'check_same_thread': False}
+    }
+else:
+    # A fixed-size pool (DB_POOL_SIZE, one per concurrent worker thread or
+    # greenlet) kept warm from startup: requests beyond it wait for a free
+    # connection rather than opening short-lived overflow connections.
+    # Connections may be handed between threads, and writers wait on the
+    # SQLite lock instead of failing.
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 0)),
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+        'connect_args': {'check_same_thread': False, 'timeout': 30}
+    }
+
+# Server-side sessions: only an opaque session id travels in the cookie and
+# each lookup is a single Redis GET. Without REDIS_URL (e.g. local
+# development) Flask's default signed-cookie sessions are used.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    app.config['SESSION_TYPE'] = 'redis'
+    app.config['SESSION_REDIS'] = redis.Redis.from_url(REDIS_URL)
+    app.config['SESSION_USE_SIGNER'] = True
+    app.config['SESSION_PERMANENT'] = False
+
+# Response/lookup cache shares the same Redis instance when available
+if REDIS_URL:
+    app.config['CACHE_TYPE'] = 'RedisCache'
+    app.config['CACHE_REDIS_URL'] = REDIS_URL
+else:
+    app.config['CACHE_TYPE'] = 'SimpleCache'
+app.config['CACHE_DEFAULT_TIMEOUT'] = 60
+
+# Static frontend assets: resolved once, and served with
+# Cache-Control: max-age so browsers stop re-downloading CSS/JS on every page
+# (conditional GETs still get a 304). In production these should be served by
+# the web server in front of Flask instead.
+frontend_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'frontend'))
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 86400
+
+# Password hashing: 'werkzeug' (default, slow KDF) or 'blake2' for throwaway
+# test databases only
+app.config['HASH_SCHEME'] = os.environ.get('HASH_SCHEME', 'werkzeug')
+
+# Per-request access logging is off by default (it costs a lock, a format and
+# a write per request); set ACCESS_LOG=1 to enable it while debugging
+app.config['ACCESS_LOG'] = os.environ.get('ACCESS_LOG', '').lower() in ('1', 'true', 'yes')
 
 # Initialize extensions
 db.init_app(app)
+cache.init_app(app)
+if REDIS_URL:
+    Session(app)
 # Use threading async mode on Windows to avoid eventlet greendns/import issues
 # Eventlet can cause import hangs on some Windows setups; threading is fine for
-# development and testing here.
-socketio = SocketIO(app, cors_allowed_origins="*", logger=True, engineio_logger=True, async_mode='threading')
+# development and testing here. Production deployments with many connected
+# clients should set SOCKETIO_ASYNC_MODE=eventlet (or gevent).
+SOCKETIO_ASYNC_MODE = os.environ.get('SOCKETIO_ASYNC_MODE', 'threading')
+# Opt-in message queue (SOCKETIO_MESSAGE_QUEUE, e.g. a Redis URL) so several
+# server processes share rooms: each emit still reaches this process's clients
+# directly and is also published for the other processes' listeners. The
+# manager is built here rather than through message_queue= so queued messages
+# use orjson too.
+SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+socketio_options = {}
+if SOCKETIO_MESSAGE_QUEUE:
+    socketio_options['client_manager'] = RedisManager(SOCKETIO_MESSAGE_QUEUE, json=SocketIOJSON)
+socketio = SocketIO(app, cors_allowed_origins="*", logger=False, engineio_logger=False,
+                    async_mode=SOCKETIO_ASYNC_MODE, json=SocketIOJSON, **socketio_options)
 
 # Register blueprints
 app.register_blueprint(api)
@@ -52,11 +128,7 @@ init_socketio_events(socketio)
 def index():
     """Serve the main application login page"""
     try:
-        frontend_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'frontend')
-        index_path = os.path.join(frontend_dir, 'index.html')
-        logger.info(f"Serving index.html from: {index_path}")
-        logger.info(f"File exists: {os.path.exists(index_path)}")
-        return send_file(index_path)
+        return send_from_directory(frontend_dir, 'index.html')
     except Exception as e:
         logger.error(f"Error serving index.html: {e}")
         return f"Error: {str(e)}", 500
@@ -78,20 +150,17 @@ def debug():
 @app.route('/css/<path:filename>')
 def serve_css(filename):
     """Serve CSS files"""
-    frontend_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'frontend')
-    return send_file(os.path.join(frontend_dir, 'css', filename))
+    return send_from_directory(os.path.join(frontend_dir, 'css'), filename)
 
 @app.route('/js/<path:filename>')
 def serve_js(filename):
     """Serve JavaScript files"""
-    frontend_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'frontend')
-    return send_file(os.path.join(frontend_dir, 'js', filename))
+    return send_from_directory(os.path.join(frontend_dir, 'js'), filename)
 
 @app.route('/<filename>.html')
 def serve_html(filename):
     """Serve HTML files"""
-    frontend_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'frontend')
-    return send_file(os.path.join(frontend_dir, f'{filename}.html'))
+    return send_from_directory(frontend_dir, f'{filename}.html')
 
 @app.route('/api_info')
 def api_info():
@@ -112,20 +181,22 @@ def api_info():
             <li>GET /api/stores - Get all stores</li>
             <li>GET /api/products - Get all products</li>
             <li>POST /api/products - Create new product</li>
-            <li>GET /api/inventory - Get inventory (optional ?store_id=X)</li>
+            <li>GET /api/inventory - Get inventory (optional ?store_id=X&limit=N&offset=M)</li>
             <li>POST /api/inventory/update - Update inventory</li>
             <li>POST /api/inventory/transfer - Transfer between stores</li>
+            <li>POST /api/inventory/bulk_update - Apply a batch of inventory updates</li>
             <li>GET /api/reports/dashboard - Get dashboard KPIs</li>
-            <li>GET /api/reports/low-stock - Get low stock items</li>
+            <li>GET /api/reports/low-stock - Get low stock items, most urgent first (optional ?store_id=X&limit=N)</li>
             <li>GET /api/reports/stock - Get stock movement report</li>
-            <li>GET /api/transactions - Get recent transactions</li>
+            <li>GET /api/transactions - Get recent transactions (optional ?limit=N&offset=M)</li>
             <li>GET /api/changes - Get recent changes (polling)</li>
         </ul>
         <h3>WebSocket Events:</h3>
         <ul>
-            <li>inventory_update - Real-time inventory changes</li>
-            <li>transfer_update - Real-time transfer notifications</li>
-            <li>product_update - Real-time product changes</li>
+            <li>inventory_update - Real-time inventory changes (join_dashboard first)</li>
+            <li>transfer_update - Real-time transfer notifications (join_dashboard first)</li>
+            <li>product_update - Real-time product changes (join_dashboard first)</li>
+            <li>store_inventory_update / store_transfer_update - Per-store changes (join_store first)</li>
         </ul>
         <p><a href="/">Go to Application</a></p>
     </body>
@@ -142,106 +213,7 @@ def login():
     if not username or not password:
         return jsonify({'error': 'Username and password required'}), 400
     
-    user = User.query.filter_by(username=username).first()
-    if user and user.check_password(password):
-        session['user_id'] = user.id
-        session['username'] = user.username
-        session['role'] = user.role
-        return jsonify({
-            'message': 'Login successful',
-            'user': user.to_dict()
-        })
-    else:
-        return jsonify({'error': 'Invalid credentials'}), 401
-
-
-# Enhanced API endpoints with SocketIO integration
-@app.route('/api/inventory/update', methods=['POST'])
-def api_update_inventory():
-    """Update inventory with real-time broadcasting"""
-    if 'user_id' not in session:
-        return jsonify({'error': 'Authentication required'}), 401
-    
-    try:
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': 'JSON data required'}), 400
-        
-        required_fields = ['store_id', 'product_id', 'delta']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
-        
-        service = InventoryService(user_id=session['user_id'])
-        result = service.update_stock(
-            store_id=data['store_id'],
-            product_id=data['product_id'],
-            delta=data['delta'],
-            reason=data.get('reason', 'Manual update')
-        )
-        
-        # Broadcast the update via SocketIO
-        broadcast_inventory_update(
-            socketio=socketio,
-            product_id=data['product_id'],
-            store_id=data['store_id'],
-            new_qty=result['new_quantity'],
-            transaction_id=result['transaction_id'],
-            timestamp=result['timestamp']
-        )
-        
-        return jsonify(result)
-        
-    except ValueError as e:
-        return jsonify({'error': str(e)}), 400
-    except Exception as e:
-        logger.error(f"Error updating inventory: {str(e)}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/api/inventory/transfer', methods=['POST'])
-def api_transfer_inventory():
-    """Transfer inventory with real-time broadcasting"""
-    if 'user_id' not in session:
-        return jsonify({'error': 'Authentication required'}), 401
-    
-    try:
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': 'JSON data required'}), 400
-        
-        required_fields = ['from_store', 'to_store', 'product_id', 'quantity']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
-        
-        service = InventoryService(user_id=session['user_id'])
-        result = service.transfer_stock(
-            from_store_id=data['from_store'],
-            to_store_id=data['to_store'],
-            product_id=data['product_id'],
-            quantity=data['quantity'],
-            reason=data.get('reason', 'Stock transfer')
-        )
-        
-        # Broadcast the transfer update via SocketIO
-        broadcast_transfer_update(
-            socketio=socketio,
-            from_store_id=data['from_store'],
-            to_store_id=data['to_store'],
-            product_id=data['product_id'],
-            quantity=data['quantity'],
-            transaction_data=result,
-            timestamp=result['timestamp']
-        )
-        
-        return jsonify(result)
-        
-    except ValueError as e:
-        return jsonify({'error': str(e)}), 400
-    except Exception as e:
-        logger.error(f"Error transferring inventory: {str(e)}")
-        return jsonify({'error': str(e)}), 500
+    return login_user(username, password)
 
 
 @app.errorhandler(404)
@@ -257,24 +229,18 @@ def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
 
 
-@app.before_request
-def log_request():
-    """Log incoming requests"""
-    if request.endpoint and not request.endpoint.startswith('static'):
-        logger.info(f"{request.method} {request.path} from {request.remote_addr}")
-
-
 @app.after_request
 def after_request(response):
-    """Add CORS headers and log response"""
+    """Add CORS headers and, if ACCESS_LOG is enabled, log the request"""
     response.headers.add('Access-Control-Allow-Origin', '*')
     response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
     response.headers.add('Access-Control-Allow-Credentials', 'true')
     
-    # Log response status for non-static requests
-    if request.endpoint and not request.endpoint.startswith('static'):
-        logger.info(f"Response: {response.status_code}")
+    # One access-log line per non-static request, only when enabled
+    if app.config['ACCESS_LOG'] and request.endpoint and not request.endpoint.startswith('static'):
+        logger.info("%s %s from %s -> %s", request.method, request.path,
+                    request.remote_addr, response.status_code)
     
     return response
 
@@ -283,7 +249,11 @@ if __name__ == '__main__':
     # Create database tables if they don't exist
     with app.app_context():
         db.create_all()
+        ensure_column_defaults()
+        ensure_indexes()
         logger.info("Database tables created/verified")
+        if not is_memory_sqlite(app.config['SQLALCHEMY_DATABASE_URI']):
+            warm_connection_pool(DB_POOL_SIZE)
     
     # Run the application with SocketIO
     logger.info("Starting Retail Chain Inventory Tracker server...")
@@ -0,0 +1,11 @@
+"""
+Cache
+
+Shared Flask-Caching instance for the Retail Chain Inventory Tracker.
+Bound to the Flask app in app.py; uses Redis when REDIS_URL is configured
+and an in-process cache otherwise.
+"""
+
+from flask_caching import Cache
+
+cache = Cache()
@@ -2,9 +2,15 @@ import sys, os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from app import app
 from models import db, Transaction
+from sqlalchemy.orm import joinedload
 
 with app.app_context():
-    transactions = Transaction.query.order_by(Transaction.timestamp.desc()).limit(5).all()
+    # Join product/store into the same query and stream rows instead of
+    # materialising the whole list
+    transactions = Transaction.query.options(
+        joinedload(Transaction.product),
+        joinedload(Transaction.store)
+    ).order_by(Transaction.timestamp.desc()).limit(5).yield_per(100)
     print("\n" + "="*80)
     print("RECENT TRANSACTIONS WITH QUANTITIES")
     print("="*80)
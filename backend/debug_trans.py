@@ -2,10 +2,17 @@ import sys, os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from app import app
 from models import db, Transaction
+from sqlalchemy.orm import joinedload
 import json
 
 with app.app_context():
-    transactions = Transaction.query.order_by(Transaction.timestamp.desc()).limit(3).all()
+    # Prefetch every relationship to_dict() touches so no lazy loads happen
+    transactions = Transaction.query.options(
+        joinedload(Transaction.product),
+        joinedload(Transaction.store),
+        joinedload(Transaction.related_store),
+        joinedload(Transaction.user)
+    ).order_by(Transaction.timestamp.desc()).limit(3).yield_per(100)
     print("\n" + "="*80)
     print("MOST RECENT TRANSACTIONS - FULL JSON")
     print("="*80)
@@ -9,22 +9,153 @@ import os
 import sys
 from datetime import datetime, timezone
 
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.schema import CreateIndex, CreateTable
+
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app import app
-from models import db, User, Store, Product, InventoryItem, Transaction
+from models import db, hash_password, is_memory_sqlite, User, Store, Product, InventoryItem, Transaction
 from services.inventory_service import InventoryService
 
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER; batches are sized to stay under it
+SQLITE_MAX_VARIABLES = 999
+
+# Pre-generated schema + sample data dump (see scripts/generate_seed_sql.py)
+SEED_SQL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'seed.sql')
+
+
+def _schema_script(with_indexes=True):
+    """Render the schema (tables in dependency order, optionally with their indexes) as one SQL script"""
+    dialect = db.engine.dialect
+    statements = []
+    for table in db.metadata.sorted_tables:
+        statements.append(str(CreateTable(table).compile(dialect=dialect)).strip())
+        if with_indexes:
+            for index in table.indexes:
+                statements.append(str(CreateIndex(index).compile(dialect=dialect)).strip())
+    return ';\n'.join(statements) + ';\n'
+
+
+def _remove_sqlite_file(url):
+    """Delete an on-disk SQLite database and its WAL side files (no-op for in-memory)"""
+    if is_memory_sqlite(str(url)):
+        return
+    db.engine.dispose()
+    for suffix in ('', '-wal', '-shm'):
+        path = url.database + suffix
+        if os.path.exists(path):
+            os.unlink(path)
 
-def create_database():
-    """Create all database tables"""
+
+def _executescript(script):
+    """Run a multi-statement SQL script on a raw sqlite3 connection"""
+    connection = db.engine.raw_connection()
+    try:
+        connection.driver_connection.executescript(script)
+    finally:
+        connection.close()
+
+
+def create_database(with_indexes=True):
+    """
+    Create all database tables
+    
+    Args:
+        with_indexes (bool): Also create the secondary indexes. Bulk seeding
+            passes False and calls create_indexes() once the rows are in.
+    """
     print("Creating database tables...")
-    with app.app_context():
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() != 'sqlite':
         # Drop all tables and recreate (for clean setup)
         db.drop_all()
         db.create_all()
-        print("✓ Database tables created successfully")
+    else:
+        # Start from an empty file rather than introspecting and dropping
+        # every table, then create the schema in one executescript() call
+        _remove_sqlite_file(url)
+        _executescript(_schema_script(with_indexes))
+    print("✓ Database tables created successfully")
+
+
+def create_indexes():
+    """Build every model index (skipping ones that already exist) after a bulk load"""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+
+
+def check_foreign_keys():
+    """Validate the loaded rows with PRAGMA foreign_key_check (SQLite only)"""
+    if db.engine.dialect.name != 'sqlite':
+        return
+    violations = db.session.execute(text('PRAGMA foreign_key_check')).all()
+    if violations:
+        raise RuntimeError(f"Seed data violates foreign keys: {violations}")
+
+
+def build_database():
+    """
+    Create the schema and seed it through Python
+    
+    Uses the usual SQLite bulk-load order: tables first, rows inserted
+    without index maintenance, then the indexes built in one pass each and
+    the foreign keys checked once. SQLite connections here never enable
+    PRAGMA foreign_keys, so no per-row FK checks run during the inserts.
+    """
+    create_database(with_indexes=False)
+    seed_database()
+    print("Building indexes...")
+    create_indexes()
+    check_foreign_keys()
+    print("✓ Indexes built and foreign keys verified")
+
+
+def load_seed_dump(path=SEED_SQL_PATH):
+    """
+    Recreate the SQLite database from the pre-generated seed.sql dump
+    
+    The dump holds the schema and every seed row with the password hashes
+    already computed, so this is one executescript() call with no ORM work
+    and no KDF. Regenerate it with scripts/generate_seed_sql.py whenever the
+    models or seed data change.
+    """
+    print(f"Loading schema and sample data from {os.path.basename(path)}...")
+    with open(path, encoding='utf-8') as f:
+        script = f.read()
+    _remove_sqlite_file(make_url(app.config['SQLALCHEMY_DATABASE_URI']))
+    _executescript(script)
+    print("✓ Database loaded successfully")
+
+
+def _can_load_seed_dump():
+    """seed.sql is SQLite-specific; use it when present unless --no-dump is passed"""
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    return (url.get_backend_name() == 'sqlite' and os.path.exists(SEED_SQL_PATH)
+            and '--no-dump' not in sys.argv[1:])
+
+
+def _insert_rows(model, rows):
+    """
+    Insert plain dict rows as multi-row INSERT ... VALUES (...), (...) statements
+    
+    Rows must all have the same keys. Batches are sized by the table's column
+    count (column defaults may add parameters) so a statement never needs more
+    than SQLITE_MAX_VARIABLES bound parameters.
+    
+    Every full batch has the same shape, so SQLAlchemy's engine-level compiled
+    cache renders the SQL once and sqlite3's statement cache reuses the
+    prepared statement for the following batches.
+    """
+    if not rows:
+        return
+    table = model.__table__
+    batch_size = max(1, SQLITE_MAX_VARIABLES // len(table.columns))
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(table.insert().values(rows[start:start + batch_size]))
 
 
 def seed_users():
@@ -44,18 +175,22 @@ def seed_users():
         'staff': ['inventory_view', 'reports', 'transactions']
     }
 
-    for user_data in users_data:
-        user = User(
-            username=user_data['username'],
-            role=user_data['role']
-        )
-        user.set_password(user_data['password'])
-        # assign default permissions based on role
-        perms = default_permissions.get(user_data['role'], [])
-        user.set_permissions(perms)
-        db.session.add(user)
-    
-    db.session.commit()
+    # Hash each distinct password once; the KDF dominates user seeding
+    # (set HASH_SCHEME=blake2 for throwaway test databases)
+    password_hashes = {
+        password: hash_password(password)
+        for password in {user_data['password'] for user_data in users_data}
+    }
+    _insert_rows(User, [
+        {
+            'username': user_data['username'],
+            'role': user_data['role'],
+            'password_hash': password_hashes[user_data['password']],
+            # assign default permissions based on role
+            'permissions': User.serialize_permissions(default_permissions.get(user_data['role'], []))
+        }
+        for user_data in users_data
+    ])
     print(f"✓ Created {len(users_data)} sample users")
     print("  Login credentials:")
     for user_data in users_data:
@@ -74,14 +209,7 @@ def seed_stores():
         {'name': 'Online Fulfillment', 'location': 'Virtual - Online Orders'},
     ]
     
-    for store_data in stores_data:
-        store = Store(
-            name=store_data['name'],
-            location=store_data['location']
-        )
-        db.session.add(store)
-    
-    db.session.commit()
+    _insert_rows(Store, stores_data)
     print(f"✓ Created {len(stores_data)} sample stores")
 
 
@@ -156,11 +284,7 @@ def seed_products():
         },
     ]
     
-    for product_data in products_data:
-        product = Product(**product_data)
-        db.session.add(product)
-    
-    db.session.commit()
+    _insert_rows(Product, products_data)
     print(f"✓ Created {len(products_data)} sample products")
 
 
@@ -168,10 +292,6 @@ def seed_inventory():
     """Create sample inventory with varying stock levels"""
     print("Creating sample inventory...")
     
-    # Get all stores and products
-    stores = Store.query.all()
-    products = Product.query.all()
-    
     # Sample inventory data (store_id, product_id, quantity)
     # Some items will be below reorder level to demonstrate low stock alerts
     inventory_data = [
@@ -216,15 +336,11 @@ def seed_inventory():
         (4, 8, 60),  # USB-C Charger
     ]
     
-    for store_id, product_id, quantity in inventory_data:
-        inventory_item = InventoryItem(
-            store_id=store_id,
-            product_id=product_id,
-            quantity=quantity
-        )
-        db.session.add(inventory_item)
-    
-    db.session.commit()
+    now = datetime.now(timezone.utc)
+    _insert_rows(InventoryItem, [
+        {'store_id': store_id, 'product_id': product_id, 'quantity': quantity, 'last_updated': now}
+        for store_id, product_id, quantity in inventory_data
+    ])
     print(f"✓ Created {len(inventory_data)} inventory items")
 
 
@@ -232,7 +348,7 @@ def seed_transactions():
     """Create sample transaction history with before/after quantities"""
     print("Creating sample transaction history...")
     
-    admin_user = User.query.filter_by(username='admin').first()
+    admin_user = User.get_by_username('admin')
     
     # Sample transactions to show various activities
     transactions_data = [
@@ -289,45 +405,57 @@ def seed_transactions():
         },
     ]
     
+    # Multi-row VALUES needs identical keys on every row
+    now = datetime.now(timezone.utc)
     for transaction_data in transactions_data:
-        transaction = Transaction(**transaction_data)
-        db.session.add(transaction)
-    
-    db.session.commit()
+        transaction_data.setdefault('related_store_id', None)
+        transaction_data['timestamp'] = now
+    _insert_rows(Transaction, transactions_data)
     print(f"✓ Created {len(transactions_data)} sample transactions")
 
 
+def seed_database():
+    """Run every seed phase in one transaction: a single commit/fsync instead of one per phase"""
+    with db.session.begin():
+        seed_users()
+        seed_stores()
+        seed_products()
+        seed_inventory()
+        seed_transactions()
+
+
 def print_summary():
     """Print a summary of created data"""
     print("\n" + "="*50)
     print("DATABASE INITIALIZATION COMPLETE")
     print("="*50)
     
-    with app.app_context():
-        user_count = User.query.count()
-        store_count = Store.query.count()
-        product_count = Product.query.count()
-        inventory_count = InventoryItem.query.count()
-        transaction_count = Transaction.query.count()
-        
-        print(f"Users created: {user_count}")
-        print(f"Stores created: {store_count}")
-        print(f"Products created: {product_count}")
-        print(f"Inventory items created: {inventory_count}")
-        print(f"Transactions created: {transaction_count}")
-        
-        # Show low stock items
-        service = InventoryService()
-        low_stock_items = service.get_low_stock_items()
-        
-        print(f"\nLow stock alerts: {len(low_stock_items)}")
-        if low_stock_items:
-            print("Items requiring attention:")
-            for item in low_stock_items[:5]:  # Show first 5
-                print(f"  - {item['product_name']} at {item['store_name']}: {item['quantity']} (reorder at {item['reorder_level']})")
-        
-        print(f"\nDatabase file created: database.db")
-        print("You can now start the application with: python app.py")
+    # All five table counts in a single round trip
+    user_count, store_count, product_count, inventory_count, transaction_count = db.session.execute(
+        select(*(
+            select(func.count()).select_from(model).scalar_subquery()
+            for model in (User, Store, Product, InventoryItem, Transaction)
+        ))
+    ).one()
+    
+    print(f"Users created: {user_count}")
+    print(f"Stores created: {store_count}")
+    print(f"Products created: {product_count}")
+    print(f"Inventory items created: {inventory_count}")
+    print(f"Transactions created: {transaction_count}")
+    
+    # Show low stock items
+    service = InventoryService()
+    low_stock_items = service.get_low_stock_summary()
+    
+    print(f"\nLow stock alerts: {len(low_stock_items)}")
+    if low_stock_items:
+        print("Items requiring attention:")
+        for item in low_stock_items[:5]:  # Show first 5
+            print(f"  - {item.product_name} at {item.store_name}: {item.quantity} (reorder at {item.reorder_level})")
+    
+    print(f"\nDatabase file created: database.db")
+    print("You can now start the application with: python app.py")
 
 
 def main():
@@ -337,12 +465,10 @@ def main():
     
     try:
         with app.app_context():
-            create_database()
-            seed_users()
-            seed_stores()
-            seed_products()
-            seed_inventory()
-            seed_transactions()
+            if _can_load_seed_dump():
+                load_seed_dump()
+            else:
+                build_database()
             print_summary()
             
     except Exception as e:
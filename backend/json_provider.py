@@ -0,0 +1,101 @@
+"""
+JSON Provider
+
+orjson-backed replacement for Flask's default JSON provider. Assigned to
+``app.json`` in app.py so every ``jsonify`` call and ``request.get_json``
+goes through the C serializer without changes to the handlers. Datetimes are
+encoded natively (naive values are treated as UTC), so model dicts can carry
+raw ``datetime`` objects. ``SocketIOJSON`` gives SocketIO the same encoder,
+and ``PreEncodedJSON`` lets a payload emitted to several audiences be
+serialized only once. SocketIO's Redis message queue is given the same
+encoder, so pre-encoded payloads are spliced into its envelopes as well.
+"""
+
+import decimal
+
+import orjson
+from flask.json.provider import JSONProvider
+
+_ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    """Serialize the few types orjson does not handle natively"""
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(obj):
+    """Serialize obj to a JSON string with the shared options"""
+    return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode()
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider using orjson for encoding and decoding"""
+
+    def dumps(self, obj, **kwargs):
+        """Serialize obj to a JSON string; stdlib-only kwargs are ignored"""
+        return _dumps(obj)
+
+    def loads(self, s, **kwargs):
+        """Deserialize a JSON string or bytes"""
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """Build a JSON response from the encoded bytes without a str round trip"""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS),
+            mimetype='application/json'
+        )
+
+
+class PreEncodedJSON:
+    """
+    A SocketIO event argument serialized once, up front
+    
+    python-socketio encodes each emit's ``[event, *args]`` list separately, so
+    emitting one dict to several rooms re-serializes it every time. Wrapping
+    it here encodes it once; ``SocketIOJSON.dumps`` splices the cached text in.
+    """
+    __slots__ = ('json',)
+
+    def __init__(self, obj):
+        self.json = _dumps(obj)
+
+
+def _has_pre_encoded(obj):
+    """Whether obj is a list holding at least one PreEncodedJSON item"""
+    return isinstance(obj, list) and any(isinstance(item, PreEncodedJSON) for item in obj)
+
+
+def _splice_list(items):
+    """Encode a list, inserting the cached text of PreEncodedJSON items as-is"""
+    return '[' + ','.join(
+        item.json if isinstance(item, PreEncodedJSON) else _dumps(item)
+        for item in items
+    ) + ']'
+
+
+class SocketIOJSON:
+    """json-module stand-in for SocketIO(json=...) so emitted payloads use orjson too"""
+
+    @staticmethod
+    def dumps(obj, *args, **kwargs):
+        """Serialize obj to a JSON string; stdlib-only arguments are ignored"""
+        if _has_pre_encoded(obj):
+            # An event packet ([event, *args]) carrying pre-encoded arguments
+            return _splice_list(obj)
+        if isinstance(obj, dict) and len(obj) > 1 and _has_pre_encoded(obj.get('data')):
+            # A message-queue envelope whose 'data' is such an argument list
+            rest = {key: value for key, value in obj.items() if key != 'data'}
+            return _dumps(rest)[:-1] + ',"data":' + _splice_list(obj['data']) + '}'
+        return _dumps(obj)
+
+    @staticmethod
+    def loads(s, *args, **kwargs):
+        """Deserialize a JSON string or bytes"""
+        return orjson.loads(s)
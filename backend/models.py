@@ -5,13 +5,134 @@ This module defines the database schema using SQLAlchemy ORM.
 Models include User, Store, Product, InventoryItem, and Transaction.
 """
 
+import hashlib
+import hmac
+import os
+import sqlite3
+from functools import lru_cache
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DateTime, MetaData, bindparam, event, func, inspect, select, type_coerce
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
 from datetime import datetime, timezone
 from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
 
 
+# Prefix marking the fast keyed-BLAKE2 hashes produced under HASH_SCHEME='blake2'
+BLAKE2_PREFIX = 'blake2b$'
+
+
+def _blake2_digest(password, salt):
+    """Keyed, salted BLAKE2b digest of a password (key = the app's SECRET_KEY)"""
+    key = current_app.config['SECRET_KEY'].encode()[:64]
+    return hashlib.blake2b(password.encode(), key=key, salt=salt, digest_size=32).hexdigest()
+
+
+def hash_password(password):
+    """
+    Hash a password according to the app's HASH_SCHEME config
+    
+    'werkzeug' (the default) uses Werkzeug's slow KDF. 'blake2' stores a keyed
+    BLAKE2b digest that is quick to compute and verify; it is meant only for
+    throwaway test databases, never for real accounts.
+    """
+    if current_app.config.get('HASH_SCHEME') == 'blake2':
+        salt = os.urandom(16)
+        return f"{BLAKE2_PREFIX}{salt.hex()}${_blake2_digest(password, salt)}"
+    return generate_password_hash(password)
+
+
+def verify_password(password_hash, password):
+    """Check a password against a hash from either scheme; the hash says which one it is"""
+    if password_hash.startswith(BLAKE2_PREFIX):
+        salt_hex, digest = password_hash[len(BLAKE2_PREFIX):].split('$', 1)
+        return hmac.compare_digest(digest, _blake2_digest(password, bytes.fromhex(salt_hex)))
+    return check_password_hash(password_hash, password)
+
+
+def _utcnow():
+    """Timezone-aware current UTC time, shared by all timestamp column defaults"""
+    return datetime.now(timezone.utc)
+
+
+class utcnow(FunctionElement):
+    """
+    Current UTC time evaluated by the database, for server-side column defaults
+    
+    Naive UTC like the Python-side defaults. SQLite's CURRENT_TIMESTAMP only
+    has whole seconds, which would make ``timestamp > since`` polling miss
+    rows written in the same second, so it is rendered with milliseconds there,
+    zero-padded to the six fraction digits SQLAlchemy writes: the column is
+    compared as text, and '...:05.120' neither equals nor sorts after the
+    '...:05.120000' of the same instant bound from Python.
+    """
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _compile_utcnow(element, compiler, **kw):
+    return 'CURRENT_TIMESTAMP'
+
+
+@compiles(utcnow, 'sqlite')
+def _compile_utcnow_sqlite(element, compiler, **kw):
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
+@compiles(utcnow, 'postgresql')
+def _compile_utcnow_postgresql(element, compiler, **kw):
+    return "timezone('utc', now())"
+
+
+@event.listens_for(Engine, 'connect')
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Tune every new SQLite connection (app, init_db and the helper scripts)
+    
+    WAL keeps readers from blocking behind writers and, with synchronous=NORMAL,
+    avoids an fsync per commit; the larger page cache, in-memory temp tables
+    and memory-mapped I/O cut read syscalls.
+    """
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA cache_size=-64000')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA mmap_size=268435456')
+    cursor.close()
+
+
+def _column_serializer(exclude=()):
+    """
+    Class decorator that compiles a column-to-dict function for a model
+    
+    The generated ``_column_dict(obj)`` reads every column attribute in table
+    order (minus ``exclude``) in a single expression. Datetimes are left as
+    ``datetime`` objects; the orjson provider encodes them natively.
+    """
+    def decorate(cls):
+        items = [
+            f'{column.key!r}: obj.{column.key}'
+            for column in cls.__table__.columns
+            if column.key not in exclude
+        ]
+        source = 'def _column_dict(obj):\n    return {' + ', '.join(items) + '}'
+        namespace = {}
+        exec(source, namespace)
+        cls._column_dict = staticmethod(namespace['_column_dict'])
+        return cls
+    return decorate
+
+
+@_column_serializer(exclude=('password_hash', 'permissions'))
 class User(db.Model):
     """User model for authentication and authorization"""
     __tablename__ = 'users'
@@ -22,44 +143,64 @@ class User(db.Model):
     role = db.Column(db.String(20), nullable=False, default='user')  # user, admin, manager
     # Comma-separated permissions string. Example: 'products,inventory,reports'
     permissions = db.Column(db.Text, nullable=False, default='')
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, default=_utcnow)
+    
+    @classmethod
+    def get_by_username(cls, username):
+        """Look up a user by the unique username index (None if not found)"""
+        return db.session.execute(
+            _user_by_username_stmt(), {'username': username}
+        ).scalar_one_or_none()
     
     def set_password(self, password):
         """Hash and set the password"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
         """Check if provided password matches the hash"""
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
 
     def set_permissions(self, perms):
         """Set permissions from iterable (list/tuple). Stores as comma-separated string."""
+        self.permissions = User.serialize_permissions(perms)
+
+    @staticmethod
+    def serialize_permissions(perms):
+        """Serialize permissions (list/tuple or string) to the stored comma-separated form."""
         if perms is None:
-            self.permissions = ''
+            return ''
         elif isinstance(perms, (list, tuple)):
             # normalize to lowercase strings without spaces
-            self.permissions = ','.join([str(p).strip().lower() for p in perms])
+            return ','.join([str(p).strip().lower() for p in perms])
         else:
             # accept already-serialized string
-            self.permissions = str(perms)
+            return str(perms)
+
+    @staticmethod
+    def parse_permissions(permissions):
+        """Split a comma-separated permissions string into a list of strings."""
+        if not permissions:
+            return []
+        return [p for p in [s.strip() for s in permissions.split(',')] if p]
 
     def get_permissions(self):
         """Return permissions as a list of strings."""
-        if not self.permissions:
-            return []
-        return [p for p in [s.strip() for s in self.permissions.split(',')] if p]
+        return User.parse_permissions(self.permissions)
     
     def to_dict(self):
         """Convert model to dictionary for JSON serialization"""
-        return {
-            'id': self.id,
-            'username': self.username,
-            'role': self.role,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'permissions': self.get_permissions()
-        }
+        data = self._column_dict(self)
+        data['permissions'] = self.get_permissions()
+        return data
+
 
+@lru_cache(maxsize=None)
+def _user_by_username_stmt():
+    """Build the username lookup once; its compiled form is then cached by SQLAlchemy"""
+    return select(User).where(User.username == bindparam('username')).limit(1)
 
+
+@_column_serializer()
 class Store(db.Model):
     """Store model representing different store locations"""
     __tablename__ = 'stores'
@@ -67,7 +208,7 @@ class Store(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     location = db.Column(db.String(200), nullable=False)
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, default=_utcnow)
     
     # Relationships
     inventory_items = db.relationship('InventoryItem', backref='store', lazy=True, cascade='all, delete-orphan')
@@ -75,14 +216,10 @@ class Store(db.Model):
     
     def to_dict(self):
         """Convert model to dictionary for JSON serialization"""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'location': self.location,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        return self._column_dict(self)
 
 
+@_column_serializer()
 class Product(db.Model):
     """Product model representing items in inventory"""
     __tablename__ = 'products'
@@ -94,7 +231,7 @@ class Product(db.Model):
     reorder_level = db.Column(db.Integer, nullable=False, default=10)
     unit_cost = db.Column(db.Float, nullable=False, default=0.0)
     selling_price = db.Column(db.Float, nullable=False, default=0.0)
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, default=_utcnow)
     
     # Relationships
     inventory_items = db.relationship('InventoryItem', backref='product', lazy=True, cascade='all, delete-orphan')
@@ -102,18 +239,10 @@ class Product(db.Model):
     
     def to_dict(self):
         """Convert model to dictionary for JSON serialization"""
-        return {
-            'id': self.id,
-            'sku': self.sku,
-            'name': self.name,
-            'category': self.category,
-            'reorder_level': self.reorder_level,
-            'unit_cost': self.unit_cost,
-            'selling_price': self.selling_price,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        return self._column_dict(self)
 
 
+@_column_serializer()
 class InventoryItem(db.Model):
     """Inventory item linking stores and products with quantities"""
     __tablename__ = 'inventory_items'
@@ -122,26 +251,32 @@ class InventoryItem(db.Model):
     store_id = db.Column(db.Integer, db.ForeignKey('stores.id'), nullable=False)
     product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
     quantity = db.Column(db.Integer, nullable=False, default=0)
-    last_updated = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    # Stamped by the database on insert and on every UPDATE that does not set it
+    last_updated = db.Column(db.DateTime, server_default=utcnow(), onupdate=utcnow())
     
-    # Unique constraint to prevent duplicate store-product combinations
-    __table_args__ = (db.UniqueConstraint('store_id', 'product_id', name='unique_store_product'),)
+    # Unique constraint to prevent duplicate store-product combinations. The
+    # covering index answers store/product quantity lookups (dashboard,
+    # low-stock) from the index alone; product_id gets its own index for
+    # joins from products.
+    __table_args__ = (
+        db.UniqueConstraint('store_id', 'product_id', name='unique_store_product'),
+        db.Index('ix_inv_store_product_qty', 'store_id', 'product_id', 'quantity'),
+        db.Index('ix_inv_product', 'product_id'),
+    )
     
     def to_dict(self):
         """Convert model to dictionary for JSON serialization"""
-        return {
-            'id': self.id,
-            'store_id': self.store_id,
-            'product_id': self.product_id,
-            'quantity': self.quantity,
-            'last_updated': self.last_updated.isoformat() if self.last_updated else None,
-            'store_name': self.store.name if self.store else None,
-            'product_name': self.product.name if self.product else None,
-            'product_sku': self.product.sku if self.product else None,
-            'reorder_level': self.product.reorder_level if self.product else None
-        }
+        data = self._column_dict(self)
+        store = self.store
+        product = self.product
+        data['store_name'] = store.name if store else None
+        data['product_name'] = product.name if product else None
+        data['product_sku'] = product.sku if product else None
+        data['reorder_level'] = product.reorder_level if product else None
+        return data
 
 
+@_column_serializer()
 class Transaction(db.Model):
     """Transaction model for tracking inventory movements"""
     __tablename__ = 'transactions'
@@ -151,34 +286,163 @@ class Transaction(db.Model):
     store_id = db.Column(db.Integer, db.ForeignKey('stores.id'), nullable=False)
     type = db.Column(db.String(20), nullable=False)  # IN, OUT, TRANSFER
     quantity = db.Column(db.Integer, nullable=False)
-    timestamp = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    timestamp = db.Column(db.DateTime, server_default=utcnow())  # Stamped by the database
     note = db.Column(db.Text)
     related_store_id = db.Column(db.Integer, db.ForeignKey('stores.id'))  # For transfers
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     previous_quantity = db.Column(db.Integer)  # Quantity before transaction
     new_quantity = db.Column(db.Integer)  # Quantity after transaction
     
+    # Newest-first scans for /api/changes and recent transaction listings,
+    # plus one index per foreign key for filters and relationship loads. Rows
+    # written by one statement share a timestamp, so id breaks the tie.
+    __table_args__ = (
+        db.Index('ix_tx_ts_desc', timestamp.desc(), id.desc()),
+        # Per-store history, newest first; also serves plain store_id filters
+        db.Index('ix_tx_store_ts', 'store_id', timestamp.desc(), id.desc()),
+        db.Index('ix_tx_product', 'product_id'),
+        db.Index('ix_tx_user', 'user_id'),
+        db.Index('ix_tx_related_store', 'related_store_id'),
+    )
+    
     # Relationship to related store for transfers
     related_store = db.relationship('Store', foreign_keys=[related_store_id])
     user = db.relationship('User', backref='transactions')
     
     def to_dict(self):
         """Convert model to dictionary for JSON serialization"""
-        return {
-            'id': self.id,
-            'product_id': self.product_id,
-            'store_id': self.store_id,
-            'type': self.type,
-            'quantity': self.quantity,
-            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
-            'note': self.note,
-            'related_store_id': self.related_store_id,
-            'user_id': self.user_id,
-            'previous_quantity': self.previous_quantity,
-            'new_quantity': self.new_quantity,
-            'product_name': self.product.name if self.product else None,
-            'product_sku': self.product.sku if self.product else None,
-            'store_name': self.store.name if self.store else None,
-            'related_store_name': self.related_store.name if self.related_store else None,
-            'user_name': self.user.username if self.user else None
-        }
\ No newline at end of file
+        data = self._column_dict(self)
+        product = self.product
+        store = self.store
+        related_store = self.related_store
+        user = self.user
+        data['product_name'] = product.name if product else None
+        data['product_sku'] = product.sku if product else None
+        data['store_name'] = store.name if store else None
+        data['related_store_name'] = related_store.name if related_store else None
+        data['user_name'] = user.username if user else None
+        return data
+
+
+def is_memory_sqlite(uri):
+    """Return True if a database URI points at an in-memory SQLite database"""
+    return uri.startswith('sqlite') and (
+        uri.rstrip('/').endswith(':') or ':memory:' in uri or 'mode=memory' in uri
+    )
+
+
+def ensure_indexes():
+    """Create any indexes declared on the models that are missing from an existing database"""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+
+
+def _rebuild_sqlite_table(connection, table, column_names):
+    """
+    Recreate a SQLite table from its model, keeping its rows
+    
+    SQLite cannot change a column's DEFAULT in place, so this follows its
+    documented rebuild: create the new table under a temporary name, copy the
+    rows, drop the old table, rename, then recreate the model's indexes.
+    """
+    preparer = connection.dialect.identifier_preparer
+    # A scratch copy of the schema, so the new table's foreign keys resolve
+    scratch = MetaData()
+    for model_table in db.metadata.sorted_tables:
+        model_table.to_metadata(scratch)
+    temp = table.to_metadata(scratch, name=f'_rebuild_{table.name}')
+    columns = ', '.join(preparer.quote(name) for name in column_names)
+    
+    connection.execute(CreateTable(temp))
+    connection.exec_driver_sql(
+        f'INSERT INTO {preparer.quote(temp.name)} ({columns}) '
+        f'SELECT {columns} FROM {preparer.quote(table.name)}'
+    )
+    connection.exec_driver_sql(f'DROP TABLE {preparer.quote(table.name)}')
+    connection.exec_driver_sql(
+        f'ALTER TABLE {preparer.quote(temp.name)} RENAME TO {preparer.quote(table.name)}'
+    )
+    for index in table.indexes:
+        index.create(bind=connection)
+
+
+def ensure_column_defaults():
+    """
+    Add server-side column defaults declared on the models to an existing database
+    
+    Tables created before a column was stamped by the database (e.g.
+    Transaction.timestamp) lack its DEFAULT, so new rows would be stored with
+    NULL. PostgreSQL gets ALTER COLUMN ... SET DEFAULT; SQLite tables are
+    rebuilt, in one transaction, also when their DEFAULT is an older
+    rendering of utcnow(). NULLs already written are then backfilled with the
+    current time, and on SQLite millisecond stamps are padded to microseconds.
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    is_sqlite = db.engine.dialect.name == 'sqlite'
+    
+    def is_stale(column, reflected):
+        if reflected is None:
+            return True
+        if not is_sqlite:
+            return False
+        expected = str(column.server_default.arg.compile(dialect=db.engine.dialect))
+        return reflected.strip('()') != expected
+    
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        current = {column['name']: column for column in inspector.get_columns(table.name)}
+        missing = [
+            column for column in table.columns
+            if column.server_default is not None
+            and column.name in current and is_stale(column, current[column.name]['default'])
+        ]
+        if not missing:
+            continue
+        
+        with db.engine.connect() as connection:
+            preparer = connection.dialect.identifier_preparer
+            if connection.dialect.name == 'sqlite':
+                # pysqlite does not open a transaction for DDL on its own
+                connection.exec_driver_sql('BEGIN IMMEDIATE')
+                _rebuild_sqlite_table(connection, table, [c.name for c in table.columns if c.name in current])
+            else:
+                for column in missing:
+                    default_sql = column.server_default.arg.compile(dialect=connection.dialect)
+                    connection.exec_driver_sql(
+                        f'ALTER TABLE {preparer.quote(table.name)} '
+                        f'ALTER COLUMN {preparer.quote(column.name)} SET DEFAULT {default_sql}'
+                    )
+            for column in missing:
+                connection.execute(
+                    table.update().where(column.is_(None)).values({column.name: column.server_default.arg})
+                )
+                if is_sqlite and isinstance(column.type, DateTime):
+                    # 'YYYY-MM-DD HH:MM:SS.fff' from the millisecond default
+                    connection.execute(
+                        table.update()
+                        .where(func.length(column) == 23)
+                        .values({column.name: type_coerce(column, db.String) + '000'})
+                    )
+            connection.commit()
+
+
+def warm_connection_pool(size):
+    """
+    Open up to ``size`` pooled connections up front
+    
+    Each connection is checked out at the same time and sent a SELECT 1 (which
+    also runs the connect-time PRAGMAs), then returned to the pool, so the
+    first requests reuse ready connections instead of opening them.
+    """
+    connections = []
+    try:
+        for _ in range(size):
+            connection = db.engine.connect()
+            connections.append(connection)
+            connection.exec_driver_sql('SELECT 1')
+    finally:
+        for connection in connections:
+            connection.close()
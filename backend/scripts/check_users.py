@@ -1,21 +1,28 @@
-import sqlite3, os
-paths=[r'D:/FEWINFOCAD/retail-chain-inventory-tracker/backend/database.db', r'D:/FEWINFOCAD/retail-chain-inventory-tracker/backend/instance/database.db', r'D:/FEWINFOCAD/retail-chain-inventory-tracker/instance/database.db']
-for p in paths:
-    print('\nDB:',p,'Exists=',os.path.exists(p))
-    if not os.path.exists(p):
-        continue
-    try:
-        conn=sqlite3.connect(p)
-        cur=conn.cursor()
-        cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
-        if cur.fetchone():
-            cur.execute('SELECT id,username,role FROM users')
-            rows=cur.fetchall()
-            print('Users:')
-            for r in rows:
-                print(' ',r)
-        else:
-            print('  No users table')
-        conn.close()
-    except Exception as e:
-        print('  Error reading DB:',e)
+import os, sys
+import sqlite3
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sqlalchemy.engine import make_url
+from app import app
+
+# Use the same database file the app is configured with
+url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+p = url.database
+print('\nDB:', p)
+if url.get_backend_name() != 'sqlite' or not p or p == ':memory:' or not os.path.exists(p):
+    print('  Not an existing SQLite database file')
+    sys.exit(1)
+try:
+    # Read-only: open with mode=ro and refuse writes on the connection
+    conn = sqlite3.connect(f"file:{p}?mode=ro", uri=True)
+    conn.execute('PRAGMA query_only=1')
+    cur = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='users'")
+    if cur.fetchone() is not None:
+        print('Users:')
+        # Iterate the cursor so rows stream instead of being materialised
+        for r in conn.execute('SELECT id,username,role FROM users'):
+            print(' ', r)
+    else:
+        print('  No users table')
+    conn.close()
+except Exception as e:
+    print('  Error reading DB:', e)
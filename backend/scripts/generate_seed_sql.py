@@ -0,0 +1,43 @@
+"""
+Seed SQL Generator
+
+Runs the init_db.py seed once against an in-memory database and dumps the
+result (schema, indexes and rows, with password hashes already computed) to
+backend/seed.sql, which init_db.py then loads with a single executescript().
+Re-run this after changing the models or the seed data.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from contextlib import redirect_stdout
+import io
+
+# Always seed a private in-memory database, never the real file
+os.environ['DATABASE_URL'] = 'sqlite://'
+
+from app import app, db
+from init_db import SEED_SQL_PATH, build_database
+
+# The dump is used for real databases, so always store real KDF hashes
+app.config['HASH_SCHEME'] = 'werkzeug'
+
+
+def generate_seed_sql(path=SEED_SQL_PATH):
+    """Seed an in-memory database and write its iterdump() to path"""
+    with app.app_context():
+        with redirect_stdout(io.StringIO()):
+            build_database()
+        connection = db.engine.raw_connection()
+        try:
+            statements = list(connection.driver_connection.iterdump())
+        finally:
+            connection.close()
+    
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write('\n'.join(statements) + '\n')
+    print(f"✓ Wrote {len(statements)} statements to {path}")
+
+
+if __name__ == '__main__':
+    generate_seed_sql()
@@ -0,0 +1,129 @@
+"""
+Test script to verify /api/changes polling picks up a write right away
+Runs with the server clock ahead of UTC, where a local-time 'since' used to
+hide new transactions behind 304 responses
+"""
+import sys
+import os
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from contextlib import redirect_stdout
+import io
+
+# Run against a throwaway in-memory database unless DATABASE_URL says otherwise,
+# on a server clock 14 hours ahead of UTC
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ['TZ'] = 'Etc/GMT-14'
+time.tzset()
+
+from app import app, db
+from models import is_memory_sqlite
+from init_db import seed_database
+
+app.config['TESTING'] = True
+
+IN_MEMORY_DB = is_memory_sqlite(app.config['SQLALCHEMY_DATABASE_URI'])
+if IN_MEMORY_DB:
+    # Throwaway database: skip the slow password KDF
+    app.config['HASH_SCHEME'] = os.environ.get('HASH_SCHEME', 'blake2')
+
+# More than one /changes page, all stamped by one statement
+BULK_ITEMS = 250
+
+
+def setup_database():
+    """Create and seed the in-memory database; a file database comes from init_db.py"""
+    if not IN_MEMORY_DB:
+        return
+    with app.app_context(), redirect_stdout(io.StringIO()):
+        db.create_all()
+        seed_database()
+
+
+def check(passed, message):
+    """Print one check's outcome and return whether it passed"""
+    print(f"  {'✓' if passed else '❌'} {message}")
+    return passed
+
+
+def test_changes_polling():
+    """Poll, write, and poll again with the cursor the previous poll returned"""
+    print("=" * 60)
+    print("Testing /api/changes Polling")
+    print("=" * 60)
+
+    setup_database()
+    results = []
+
+    with app.test_client() as client:
+        login_response = client.post('/api/auth/login', json={
+            'username': 'admin',
+            'password': 'admin123'
+        })
+        if login_response.status_code != 200:
+            print("❌ Login failed for admin")
+            return False
+
+        first = client.get('/api/changes?since=2000-01-01T00:00:00Z')
+        results.append(check(first.status_code == 200, f"Initial poll returned {first.status_code}"))
+        since = first.get_json()['timestamp']
+        print(f"  Next poll since: {since}")
+
+        idle = client.get(f'/api/changes?since={since}')
+        results.append(check(idle.status_code == 304, f"Poll with no new writes returned {idle.status_code}"))
+
+        update_response = client.post('/api/inventory/update', json={
+            'store_id': 1,
+            'product_id': 1,
+            'delta': 1,
+            'reason': 'Polling test'
+        })
+        results.append(check(update_response.status_code == 200,
+                             f"Inventory update returned {update_response.status_code}"))
+        transaction_id = update_response.get_json().get('transaction_id')
+
+        after = client.get(f'/api/changes?since={since}')
+        results.append(check(after.status_code == 200, f"Poll right after the write returned {after.status_code}"))
+        if after.status_code == 200:
+            ids = [change['transaction']['id'] for change in after.get_json()['changes']]
+            results.append(check(ids == [transaction_id], f"Poll returned transactions {ids}"))
+
+            again = client.get(f"/api/changes?since={after.get_json()['timestamp']}")
+            results.append(check(again.status_code == 304, f"Following poll returned {again.status_code}"))
+
+            # A bulk batch larger than one page shares a single timestamp;
+            # paging with the (timestamp, since_id) cursor must deliver it all
+            cursor = after.get_json()
+            bulk_response = client.post('/api/inventory/bulk_update', json={
+                'items': [{'store_id': 1, 'product_id': 1, 'delta': 1}] * BULK_ITEMS,
+                'reason': 'Polling test'
+            })
+            results.append(check(bulk_response.status_code == 200,
+                                 f"Bulk update of {BULK_ITEMS} items returned {bulk_response.status_code}"))
+            expected = sorted(item['transaction_id'] for item in bulk_response.get_json().get('items', []))
+
+            delivered, polls = [], 0
+            while True:
+                page = client.get(f"/api/changes?since={cursor['timestamp']}&since_id={cursor['since_id']}")
+                polls += 1
+                if page.status_code != 200:
+                    break
+                cursor = page.get_json()
+                delivered.extend(change['transaction']['id'] for change in cursor['changes'])
+                if not cursor['has_more'] or polls > BULK_ITEMS:
+                    break
+            results.append(check(sorted(delivered) == expected,
+                                 f"Paged polls delivered {len(delivered)} of {len(expected)} bulk transactions "
+                                 f"in {polls} polls"))
+
+            final = client.get(f"/api/changes?since={cursor['timestamp']}&since_id={cursor['since_id']}")
+            results.append(check(final.status_code == 304, f"Poll after the last page returned {final.status_code}"))
+
+    passed = all(results)
+    print(f"\n{'✓ All polling checks passed' if passed else '❌ Some polling checks failed'}")
+    return passed
+
+
+if __name__ == '__main__':
+    sys.exit(0 if test_changes_polling() else 1)
@@ -1,11 +1,23 @@
 import json
-import urllib.request
-url = 'http://localhost:5000/api/auth/login'
-data = json.dumps({'username':'admin','password':'admin123'}).encode('utf-8')
-req = urllib.request.Request(url, data=data, headers={'Content-Type':'application/json'})
+import http.client
+
+# One persistent connection, reused by every request this script makes
+conn = http.client.HTTPConnection('localhost', 5000, timeout=5)
+
+
+def post_json(path, payload):
+    """POST a JSON body over the shared connection and return (status, body)"""
+    body = json.dumps(payload).encode('utf-8')
+    conn.request('POST', path, body=body, headers={'Content-Type': 'application/json'})
+    resp = conn.getresponse()
+    return resp.status, resp.read().decode('utf-8')
+
+
 try:
-    with urllib.request.urlopen(req, timeout=5) as resp:
-        print('Status:', resp.status)
-        print('Response:', resp.read().decode('utf-8'))
+    status, response = post_json('/api/auth/login', {'username': 'admin', 'password': 'admin123'})
+    print('Status:', status)
+    print('Response:', response)
 except Exception as e:
     print('Error:', e)
+finally:
+    conn.close()
@@ -7,14 +7,20 @@ import os
 import sys
 # Ensure 'backend' package directory is on sys.path so we can import app and models
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Run against a throwaway in-memory database unless DATABASE_URL says otherwise
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
 from app import app
-from models import db, User
+from models import db, User, is_memory_sqlite
+
+if is_memory_sqlite(app.config['SQLALCHEMY_DATABASE_URI']):
+    # Throwaway database: skip the slow password KDF
+    app.config['HASH_SCHEME'] = os.environ.get('HASH_SCHEME', 'blake2')
 
 
 def ensure_admin():
     with app.app_context():
         db.create_all()
-        admin = User.query.filter_by(username='admin').first()
+        admin = User.get_by_username('admin')
         if not admin:
             admin = User(username='admin', role='admin')
             admin.set_password('admin123')
@@ -0,0 +1,108 @@
+"""
+Test script to verify ensure_column_defaults() upgrades a pre-existing database
+Runs against a copy of the committed instance/database.db, whose tables predate
+the server-side timestamp defaults
+"""
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+LEGACY_DB = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'instance', 'database.db'))
+
+# Point the app at a scratch copy before it is imported
+work_dir = tempfile.mkdtemp()
+db_path = os.path.join(work_dir, 'legacy.db')
+shutil.copyfile(LEGACY_DB, db_path)
+os.environ['DATABASE_URL'] = f"sqlite:///{db_path.replace(os.sep, '/')}"
+
+from sqlalchemy import func, inspect, select
+
+from app import app, db
+from models import ensure_column_defaults, ensure_indexes, InventoryItem, Transaction
+from services.inventory_service import InventoryService
+
+
+def check(passed, message):
+    """Print one check's outcome and return whether it passed"""
+    print(f"  {'✓' if passed else '❌'} {message}")
+    return passed
+
+
+def table_counts():
+    """Row count per table, read straight from SQLite"""
+    with sqlite3.connect(db_path) as connection:
+        tables = [row[0] for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        )]
+        return {table: connection.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in tables}
+
+
+def test_schema_migration():
+    """Upgrade the legacy copy, then write through the service and check the stamps"""
+    print("=" * 60)
+    print("Testing Column Default Migration on a Pre-existing Database")
+    print("=" * 60)
+    results = []
+
+    # A row written by code that relied on the missing DEFAULT, and one stamped
+    # by the earlier millisecond rendering of it
+    with sqlite3.connect(db_path) as connection:
+        connection.execute(
+            "INSERT INTO transactions (product_id, store_id, type, quantity, note) "
+            "VALUES (1, 1, 'IN', 1, 'Written without a timestamp')"
+        )
+        connection.execute(
+            "INSERT INTO transactions (product_id, store_id, type, quantity, timestamp, note) "
+            "VALUES (1, 1, 'IN', 1, '2026-01-01 00:00:00.120', 'Stamped with milliseconds')"
+        )
+    counts_before = table_counts()
+
+    with app.app_context():
+        ensure_column_defaults()
+        ensure_indexes()
+        # A second run has nothing left to do
+        ensure_column_defaults()
+
+        inspector = inspect(db.engine)
+        for table, column in (('transactions', 'timestamp'), ('inventory_items', 'last_updated')):
+            default = {c['name']: c['default'] for c in inspector.get_columns(table)}[column]
+            results.append(check(default is not None, f"{table}.{column} has DEFAULT {default}"))
+        results.append(check(table_counts() == counts_before, "Row counts unchanged by the rebuild"))
+        index_names = {index['name'] for index in inspector.get_indexes('transactions')}
+        results.append(check('ix_tx_ts_desc' in index_names, "Transaction indexes recreated"))
+
+        nulls = db.session.scalar(select(func.count()).where(Transaction.timestamp.is_(None)))
+        results.append(check(nulls == 0, f"{nulls} transactions left without a timestamp"))
+        short = db.session.scalar(select(func.count()).where(func.length(Transaction.timestamp) != 26))
+        results.append(check(short == 0, f"{short} transaction timestamps not padded to microseconds"))
+
+        service = InventoryService(user_id=1)
+        update = service.update_stock(1, 1, 1, reason="Migration test")
+        results.append(check(update['timestamp'] is not None, f"update_stock timestamp {update['timestamp']}"))
+        transfer = service.transfer_stock(1, 2, 1, 1, reason="Migration test")
+        results.append(check(transfer['timestamp'] is not None, f"transfer_stock timestamp {transfer['timestamp']}"))
+
+        nulls = db.session.scalar(select(func.count()).where(Transaction.timestamp.is_(None)))
+        results.append(check(nulls == 0, f"{nulls} new transactions stored without a timestamp"))
+        stamp = db.session.scalar(
+            select(func.length(Transaction.timestamp)).where(Transaction.id == transfer['from_store']['transaction_id'])
+        )
+        results.append(check(stamp == 26, f"Server-stamped timestamp is {stamp} characters"))
+        stale = db.session.scalar(select(func.count()).where(InventoryItem.last_updated.is_(None)))
+        results.append(check(stale == 0, f"{stale} inventory rows without last_updated"))
+
+        db.session.remove()
+        db.engine.dispose()
+
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+    passed = all(results)
+    print(f"\n{'✓ All migration checks passed' if passed else '❌ Some migration checks failed'}")
+    return passed
+
+
+if __name__ == '__main__':
+    sys.exit(0 if test_schema_migration() else 1)
@@ -5,8 +5,20 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from concurrent.futures import ThreadPoolExecutor
+
 from app import app, db
-from models import User
+from models import User, is_memory_sqlite
+
+
+def request_with_session(session_cookie, method, endpoint):
+    """Issue one request from a fresh test client that carries the logged-in session cookie"""
+    with app.test_client() as client:
+        client.set_cookie(session_cookie.key, session_cookie.value)
+        if method == 'GET':
+            return client.get(endpoint, buffered=True)
+        return client.post(endpoint, json={})
+
 
 def test_staff_user():
     print("=" * 60)
@@ -15,7 +27,7 @@ def test_staff_user():
     
     with app.app_context():
         # Check if staff user exists in database
-        staff_user = User.query.filter_by(username='staff').first()
+        staff_user = User.get_by_username('staff')
         
         if not staff_user:
             print("❌ ERROR: Staff user not found in database!")
@@ -71,11 +83,6 @@ def test_staff_user():
                     print(f"   Expected: {expected_perms}")
                     print(f"   Got: {actual_perms}")
                 
-                # Test accessing a restricted endpoint
-                print(f"\n{'=' * 60}")
-                print("Testing Restricted Access (should be denied)")
-                print(f"{'=' * 60}")
-                
                 test_endpoints = [
                     ('GET', '/api/reports/dashboard', 'reports'),
                     ('GET', '/api/transactions', 'transactions'),
@@ -83,13 +90,28 @@ def test_staff_user():
                     ('POST', '/api/inventory/update', 'inventory'),
                     ('GET', '/api/users', 'manage_users'),
                 ]
+                allowed_endpoint = ('GET', '/api/inventory?store_id=1')
+                
+                # The checks are independent, so issue them concurrently,
+                # each from its own client sharing the login's session
+                # cookie; a single-connection in-memory database runs them
+                # one at a time
+                session_cookie = client.get_cookie(app.config['SESSION_COOKIE_NAME'])
+                requests_to_send = [(method, endpoint) for method, endpoint, _ in test_endpoints]
+                requests_to_send.append(allowed_endpoint)
+                workers = 1 if is_memory_sqlite(app.config['SQLALCHEMY_DATABASE_URI']) else len(requests_to_send)
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    responses = list(executor.map(
+                        lambda request_args: request_with_session(session_cookie, *request_args),
+                        requests_to_send
+                    ))
+                
+                # Test accessing a restricted endpoint
+                print(f"\n{'=' * 60}")
+                print("Testing Restricted Access (should be denied)")
+                print(f"{'=' * 60}")
                 
-                for method, endpoint, permission in test_endpoints:
-                    if method == 'GET':
-                        resp = client.get(endpoint)
-                    elif method == 'POST':
-                        resp = client.post(endpoint, json={})
-                    
+                for (method, endpoint, permission), resp in zip(test_endpoints, responses):
                     if resp.status_code == 403:
                         print(f"  ✓ {method} {endpoint} → 403 Forbidden (correct)")
                     else:
@@ -100,7 +122,7 @@ def test_staff_user():
                 print("Testing Allowed Access (should work)")
                 print(f"{'=' * 60}")
                 
-                resp = client.get('/api/inventory?store_id=1')
+                resp = responses[-1]
                 if resp.status_code == 200:
                     print(f"  ✓ GET /api/inventory → 200 OK (correct)")
                 else:
@@ -0,0 +1,119 @@
+BEGIN TRANSACTION;
+CREATE TABLE inventory_items (
+	id INTEGER NOT NULL, 
+	store_id INTEGER NOT NULL, 
+	product_id INTEGER NOT NULL, 
+	quantity INTEGER NOT NULL, 
+	last_updated DATETIME DEFAULT (strftime('%Y-%m-%d %H:%M:%f000', 'now')), 
+	PRIMARY KEY (id), 
+	CONSTRAINT unique_store_product UNIQUE (store_id, product_id), 
+	FOREIGN KEY(store_id) REFERENCES stores (id), 
+	FOREIGN KEY(product_id) REFERENCES products (id)
+);
+INSERT INTO "inventory_items" VALUES(1,1,1,12,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(2,1,2,25,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(3,1,3,15,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(4,1,4,3,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(5,1,5,8,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(6,1,6,5,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(7,1,7,30,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(8,1,8,50,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(9,2,1,8,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(10,2,2,18,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(11,2,3,22,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(12,2,4,45,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(13,2,5,20,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(14,2,6,2,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(15,2,7,35,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(16,2,8,40,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(17,3,1,50,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(18,3,2,100,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(19,3,3,75,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(20,3,4,80,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(21,3,5,60,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(22,3,6,25,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(23,3,7,120,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(24,3,8,200,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(25,4,1,15,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(26,4,2,30,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(27,4,3,5,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(28,4,4,20,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(29,4,5,10,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(30,4,6,8,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(31,4,7,25,'2026-10-14 12:31:21.238923');
+INSERT INTO "inventory_items" VALUES(32,4,8,60,'2026-10-14 12:31:21.238923');
+CREATE TABLE products (
+	id INTEGER NOT NULL, 
+	sku VARCHAR(50) NOT NULL, 
+	name VARCHAR(200) NOT NULL, 
+	category VARCHAR(100) NOT NULL, 
+	reorder_level INTEGER NOT NULL, 
+	unit_cost FLOAT NOT NULL, 
+	selling_price FLOAT NOT NULL, 
+	created_at DATETIME, 
+	PRIMARY KEY (id), 
+	UNIQUE (sku)
+);
+INSERT INTO "products" VALUES(1,'LAPTOP001','Gaming Laptop Pro','Electronics',5,800.0,1200.0,'2026-10-14 12:31:21.238495');
+INSERT INTO "products" VALUES(2,'PHONE001','Smartphone X1','Electronics',10,300.0,500.0,'2026-10-14 12:31:21.238501');
+INSERT INTO "products" VALUES(3,'TABLET001','Tablet Air','Electronics',8,200.0,350.0,'2026-10-14 12:31:21.238503');
+INSERT INTO "products" VALUES(4,'HEADPHONE001','Wireless Headphones','Audio',15,50.0,100.0,'2026-10-14 12:31:21.238504');
+INSERT INTO "products" VALUES(5,'SPEAKER001','Bluetooth Speaker','Audio',12,30.0,75.0,'2026-10-14 12:31:21.238505');
+INSERT INTO "products" VALUES(6,'CAMERA001','Digital Camera Pro','Photography',3,400.0,700.0,'2026-10-14 12:31:21.238506');
+INSERT INTO "products" VALUES(7,'WATCH001','Smart Watch','Wearables',20,100.0,200.0,'2026-10-14 12:31:21.238507');
+INSERT INTO "products" VALUES(8,'CHARGER001','USB-C Charger','Accessories',25,10.0,25.0,'2026-10-14 12:31:21.238508');
+CREATE TABLE stores (
+	id INTEGER NOT NULL, 
+	name VARCHAR(100) NOT NULL, 
+	location VARCHAR(200) NOT NULL, 
+	created_at DATETIME, 
+	PRIMARY KEY (id)
+);
+INSERT INTO "stores" VALUES(1,'Downtown Store','123 Main St, Downtown','2026-10-14 12:31:21.236301');
+INSERT INTO "stores" VALUES(2,'Mall Store','456 Shopping Mall, West Side','2026-10-14 12:31:21.236306');
+INSERT INTO "stores" VALUES(3,'Warehouse','789 Industrial Blvd, North','2026-10-14 12:31:21.236310');
+INSERT INTO "stores" VALUES(4,'Online Fulfillment','Virtual - Online Orders','2026-10-14 12:31:21.236312');
+CREATE TABLE transactions (
+	id INTEGER NOT NULL, 
+	product_id INTEGER NOT NULL, 
+	store_id INTEGER NOT NULL, 
+	type VARCHAR(20) NOT NULL, 
+	quantity INTEGER NOT NULL, 
+	timestamp DATETIME DEFAULT (strftime('%Y-%m-%d %H:%M:%f000', 'now')), 
+	note TEXT, 
+	related_store_id INTEGER, 
+	user_id INTEGER, 
+	previous_quantity INTEGER, 
+	new_quantity INTEGER, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(product_id) REFERENCES products (id), 
+	FOREIGN KEY(store_id) REFERENCES stores (id), 
+	FOREIGN KEY(related_store_id) REFERENCES stores (id), 
+	FOREIGN KEY(user_id) REFERENCES users (id)
+);
+INSERT INTO "transactions" VALUES(1,1,1,'IN',10,'2026-10-14 12:31:21.269374','Initial stock',NULL,1,8,18);
+INSERT INTO "transactions" VALUES(2,2,2,'OUT',5,'2026-10-14 12:31:21.269374','Sale to customer',NULL,1,23,18);
+INSERT INTO "transactions" VALUES(3,4,1,'TRANSFER',10,'2026-10-14 12:31:21.269374','Transfer to Mall Store',2,1,13,3);
+INSERT INTO "transactions" VALUES(4,7,3,'IN',50,'2026-10-14 12:31:21.269374','Restocking from supplier',NULL,1,35,85);
+INSERT INTO "transactions" VALUES(5,8,4,'OUT',15,'2026-10-14 12:31:21.269374','Online order fulfillment',NULL,1,55,40);
+CREATE TABLE users (
+	id INTEGER NOT NULL, 
+	username VARCHAR(80) NOT NULL, 
+	password_hash VARCHAR(128) NOT NULL, 
+	role VARCHAR(20) NOT NULL, 
+	permissions TEXT NOT NULL, 
+	created_at DATETIME, 
+	PRIMARY KEY (id), 
+	UNIQUE (username)
+);
+INSERT INTO "users" VALUES(1,'admin','scrypt:32768:8:1$kJazTt3KhFoHmYTh$4092531122a55b53bf3068a7df417c5ef701fa689d3f8a7601bd85938982a65567e89abfd71bb55394d53cf9f65928013e7780f5f155846b613f83bedca01499','admin','products,inventory,reports,transactions,manage_users','2026-10-14 12:31:21.235057');
+INSERT INTO "users" VALUES(2,'manager','scrypt:32768:8:1$skDGWBRKYyWlaoHc$f343e0199a8300f5f24043dc512447fe943f38ed0969b29e42f512199a7af7c37137b7d2d5c1f2daa5113199639179d2861cc23e329f0921959d1333893a832c','manager','products,inventory,reports,transactions','2026-10-14 12:31:21.235068');
+INSERT INTO "users" VALUES(3,'staff','scrypt:32768:8:1$qe2uAfWOWVpKcmhY$6d3454e165aa04efa231faebc404e6575f87c933fdb9ce62f82b03458384e7a56faa21a6bf3b6e20511a09ed08f8988c80d4af6d5113f321a0cb8d2da15dfc60','staff','inventory_view,reports,transactions','2026-10-14 12:31:21.235069');
+CREATE INDEX ix_inv_store_product_qty ON inventory_items (store_id, product_id, quantity);
+CREATE INDEX ix_inv_product ON inventory_items (product_id);
+CREATE INDEX ix_tx_related_store ON transactions (related_store_id);
+CREATE INDEX ix_tx_product ON transactions (product_id);
+CREATE INDEX ix_tx_ts_desc ON transactions (timestamp DESC, id DESC);
+CREATE INDEX ix_tx_store_ts ON transactions (store_id, timestamp DESC, id DESC);
+CREATE INDEX ix_tx_user ON transactions (user_id);
+COMMIT;
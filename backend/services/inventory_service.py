@@ -6,10 +6,137 @@ It provides OOP methods for adding products, updating stock, transferring stock,
 and generating reports while maintaining transaction safety.
 """
 
-from datetime import datetime, timezone
+from collections import namedtuple
+from contextlib import contextmanager
 from sqlalchemy.exc import IntegrityError
-from models import db, Store, Product, InventoryItem, Transaction
-from sqlalchemy import and_, or_, func
+from models import db, utcnow, User, Store, Product, InventoryItem, Transaction
+from sqlalchemy import and_, or_, case, func, insert, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import aliased, joinedload, selectinload
+
+
+# Compact low-stock row for summaries that only print these four fields
+LowStock = namedtuple('LowStock', 'product_name store_name quantity reorder_level')
+
+
+def _iter_dicts(rows):
+    """Yield Core result mappings as plain dicts (datetimes are left for orjson)"""
+    for row in rows:
+        yield dict(row)
+
+
+def _rows_to_dicts(rows):
+    """Convert Core result mappings to a list of plain dicts"""
+    return list(_iter_dicts(rows))
+
+
+def _inventory_select():
+    """Core SELECT of inventory rows shaped like InventoryItem.to_dict()"""
+    return select(
+        InventoryItem.id,
+        InventoryItem.store_id,
+        InventoryItem.product_id,
+        InventoryItem.quantity,
+        InventoryItem.last_updated,
+        Store.name.label('store_name'),
+        Product.name.label('product_name'),
+        Product.sku.label('product_sku'),
+        Product.reorder_level
+    ).outerjoin(Store, InventoryItem.store_id == Store.id).outerjoin(
+        Product, InventoryItem.product_id == Product.id
+    )
+
+
+def _transactions_select():
+    """Core SELECT of transaction rows shaped like Transaction.to_dict()"""
+    related_store = aliased(Store)
+    return select(
+        Transaction.id,
+        Transaction.product_id,
+        Transaction.store_id,
+        Transaction.type,
+        Transaction.quantity,
+        Transaction.timestamp,
+        Transaction.note,
+        Transaction.related_store_id,
+        Transaction.user_id,
+        Transaction.previous_quantity,
+        Transaction.new_quantity,
+        Product.name.label('product_name'),
+        Product.sku.label('product_sku'),
+        Store.name.label('store_name'),
+        related_store.name.label('related_store_name'),
+        User.username.label('user_name')
+    ).outerjoin(Product, Transaction.product_id == Product.id).outerjoin(
+        Store, Transaction.store_id == Store.id
+    ).outerjoin(
+        related_store, Transaction.related_store_id == related_store.id
+    ).outerjoin(
+        User, Transaction.user_id == User.id
+    )
+
+
+def _stock_probe(store_ids, product_id):
+    """
+    One SELECT of (Store, Product, InventoryItem or None) rows for a product in the given stores
+    
+    A store or product that does not exist simply produces no row. Loading
+    Store and Product here also puts them in the identity map, so
+    InventoryItem.to_dict() resolves its relationships without more queries.
+    """
+    return select(Store, Product, InventoryItem).select_from(Store).join(
+        Product, Product.id == product_id
+    ).outerjoin(
+        InventoryItem,
+        and_(InventoryItem.store_id == Store.id, InventoryItem.product_id == Product.id)
+    ).where(Store.id.in_(store_ids))
+
+
+def _upsert_inventory(deltas):
+    """
+    Add each delta to its inventory row, creating missing rows, in one statement
+    
+    Uses a multi-row INSERT ... ON CONFLICT (store_id, product_id) DO UPDATE
+    SET quantity = quantity + excluded.quantity ... RETURNING, so missing rows
+    are created holding their delta and the stock check happens in SQL against
+    the current row. An update only applies while the quantity stays
+    non-negative. The database stamps last_updated (column onupdate defaults
+    do not reach DO UPDATE, so it is set there explicitly).
+    
+    Args:
+        deltas (dict): Quantity change keyed by (store_id, product_id)
+        
+    Returns:
+        dict: Refreshed InventoryItem rows keyed by (store_id, product_id); a
+        pair whose update was refused by the stock guard is absent
+    """
+    dialect_insert = postgresql.insert if db.engine.dialect.name == 'postgresql' else sqlite.insert
+    stmt = dialect_insert(InventoryItem).values([
+        {'store_id': store_id, 'product_id': product_id, 'quantity': delta}
+        for (store_id, product_id), delta in deltas.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[InventoryItem.store_id, InventoryItem.product_id],
+        set_={'quantity': InventoryItem.quantity + stmt.excluded.quantity, 'last_updated': utcnow()},
+        where=InventoryItem.quantity + stmt.excluded.quantity >= 0
+    ).returning(InventoryItem)
+    return {
+        (item.store_id, item.product_id): item
+        for item in db.session.scalars(stmt, execution_options={'populate_existing': True})
+    }
+
+
+def _coerce_id(value, label):
+    """Return value as an int ID, accepting digit strings; raise ValueError otherwise"""
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    raise ValueError(f"{label} must be an integer")
+
+
+# Rows fetched per round-trip when streaming large result sets
+STREAM_BATCH_SIZE = 500
 
 
 class InventoryService:
@@ -21,22 +148,82 @@ class InventoryService:
     def __init__(self, user_id=None):
         """Initialize the service with optional user context"""
         self.user_id = user_id
+        # Lookups memoized for the life of this service (one request); the
+        # stock probes seed them with the rows they load
+        self._store_cache = {}
+        self._product_cache = {}
+        # Set inside bulk(): stock writes are left for its single commit
+        self._in_bulk = False
+    
+    @contextmanager
+    def bulk(self):
+        """
+        Group consecutive update_stock/bulk_update_stock/transfer_stock calls into one commit
+        
+        Inside the block each write is flushed but not committed, so N updates
+        cost one commit (and one disk sync) instead of N. The batch commits
+        when the block exits; any exception, including a failed update, rolls
+        back the whole batch. A nested bulk() joins the outer one.
+        
+        Yields:
+            InventoryService: This service
+        """
+        if self._in_bulk:
+            yield self
+            return
+        
+        self._in_bulk = True
+        try:
+            yield self
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            self._in_bulk = False
     
     def get_stores(self):
         """Get all stores"""
         return Store.query.all()
     
+    def get_stores_raw(self):
+        """Get all stores as plain dicts, bypassing ORM hydration"""
+        rows = db.session.execute(
+            select(Store.id, Store.name, Store.location, Store.created_at)
+        ).mappings().all()
+        return _rows_to_dicts(rows)
+    
     def get_store_by_id(self, store_id):
-        """Get a specific store by ID"""
-        return Store.query.get(store_id)
+        """Get a specific store by ID (memoized per service instance)"""
+        if store_id not in self._store_cache:
+            self._store_cache[store_id] = db.session.get(Store, store_id)
+        return self._store_cache[store_id]
     
     def get_products(self):
         """Get all products"""
         return Product.query.all()
     
+    def get_products_raw(self):
+        """Get all products as plain dicts, bypassing ORM hydration"""
+        rows = db.session.execute(
+            select(
+                Product.id,
+                Product.sku,
+                Product.name,
+                Product.category,
+                Product.reorder_level,
+                Product.unit_cost,
+                Product.selling_price,
+                Product.created_at
+            )
+        ).mappings().all()
+        return _rows_to_dicts(rows)
+    
     def get_product_by_id(self, product_id):
-        """Get a specific product by ID"""
-        return Product.query.get(product_id)
+        """Get a specific product by ID (memoized per service instance)"""
+        if product_id not in self._product_cache:
+            self._product_cache[product_id] = db.session.get(Product, product_id)
+        return self._product_cache[product_id]
     
     def get_product_by_sku(self, sku):
         """Get a product by SKU"""
@@ -61,11 +248,8 @@ class InventoryService:
             ValueError: If product with SKU already exists
         """
         try:
-            # Check if product with SKU already exists
-            existing_product = self.get_product_by_sku(sku)
-            if existing_product:
-                raise ValueError(f"Product with SKU '{sku}' already exists")
-            
+            # No existence check first: the UNIQUE constraint on sku rejects a
+            # duplicate atomically, and the IntegrityError is reported below
             product = Product(
                 sku=sku,
                 name=name,
@@ -125,7 +309,36 @@ class InventoryService:
         Returns:
             List[InventoryItem]: List of inventory items for the store
         """
-        return InventoryItem.query.filter_by(store_id=store_id).all()
+        return InventoryItem.query.options(
+            selectinload(InventoryItem.product),
+            selectinload(InventoryItem.store)
+        ).filter_by(store_id=store_id).all()
+    
+    def iter_inventory_raw(self, store_id=None, limit=None, offset=None):
+        """
+        Stream inventory items with store and product details as plain dicts
+        
+        Args:
+            store_id (int, optional): Filter by specific store
+            limit (int, optional): Maximum number of rows to return
+            offset (int, optional): Number of rows to skip
+            
+        Yields:
+            dict: Inventory rows shaped like InventoryItem.to_dict()
+        """
+        stmt = _inventory_select().order_by(InventoryItem.id)
+        
+        if store_id:
+            stmt = stmt.where(InventoryItem.store_id == store_id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        if offset:
+            stmt = stmt.offset(offset)
+        
+        rows = db.session.execute(
+            stmt.execution_options(yield_per=STREAM_BATCH_SIZE)
+        ).mappings()
+        return _iter_dicts(rows)
     
     def get_inventory_item(self, store_id, product_id):
         """
@@ -143,7 +356,7 @@ class InventoryService:
             product_id=product_id
         ).first()
     
-    def update_stock(self, store_id, product_id, delta, reason="Manual update"):
+    def update_stock(self, store_id, product_id, delta, reason="Manual update", commit=True):
         """
         Update stock quantity for a product in a store
         
@@ -152,6 +365,9 @@ class InventoryService:
             product_id (int): Product ID  
             delta (int): Change in quantity (positive for increase, negative for decrease)
             reason (str): Reason for the stock change
+            commit (bool): Commit the change; False (or a bulk() block) leaves it
+                flushed for the caller to commit. A failure still rolls back the
+                whole session.
             
         Returns:
             dict: Result containing new quantity and transaction info
@@ -160,37 +376,35 @@ class InventoryService:
             ValueError: If insufficient stock or invalid parameters
         """
         try:
-            # Validate inputs
+            # Validate inputs; the upsert's result is keyed by integer IDs
+            store_id = _coerce_id(store_id, "Store ID")
+            product_id = _coerce_id(product_id, "Product ID")
             if not isinstance(delta, int) or delta == 0:
                 raise ValueError("Delta must be a non-zero integer")
             
-            store = self.get_store_by_id(store_id)
-            product = self.get_product_by_id(product_id)
-            
-            if not store:
-                raise ValueError(f"Store with ID {store_id} not found")
-            if not product:
+            # Store, product and current stock in one round-trip; the
+            # per-entity lookups only run to explain a missing row
+            row = db.session.execute(_stock_probe([store_id], product_id)).first()
+            if row is not None:
+                self._store_cache[store_id] = row.Store
+                self._product_cache[product_id] = row.Product
+            else:
+                if not self.get_store_by_id(store_id):
+                    raise ValueError(f"Store with ID {store_id} not found")
                 raise ValueError(f"Product with ID {product_id} not found")
             
-            # Get or create inventory item
-            inventory_item = self.get_inventory_item(store_id, product_id)
-            if not inventory_item:
-                inventory_item = InventoryItem(
-                    store_id=store_id,
-                    product_id=product_id,
-                    quantity=0
-                )
-                db.session.add(inventory_item)
+            # A missing row can only take stock in; otherwise the write itself
+            # checks the level in SQL, so there is no read-modify-write race
+            current_qty = row.InventoryItem.quantity if row.InventoryItem else 0
+            if row.InventoryItem is None and delta < 0:
+                raise ValueError(f"Insufficient stock. Current: {current_qty}, Requested: {abs(delta)}")
             
-            # Check for sufficient stock if decreasing
-            new_quantity = inventory_item.quantity + delta
-            if new_quantity < 0:
-                raise ValueError(f"Insufficient stock. Current: {inventory_item.quantity}, Requested: {abs(delta)}")
-            
-            # Update quantity
-            previous_qty = inventory_item.quantity
-            inventory_item.quantity = new_quantity
-            inventory_item.last_updated = datetime.now(timezone.utc)
+            # Create or update the inventory row in one statement
+            inventory_item = _upsert_inventory({(store_id, product_id): delta}).get((store_id, product_id))
+            if inventory_item is None:
+                raise ValueError(f"Insufficient stock. Current: {current_qty}, Requested: {abs(delta)}")
+            new_quantity = inventory_item.quantity
+            previous_qty = new_quantity - delta
             
             # Create transaction record
             transaction_type = "IN" if delta > 0 else "OUT"
@@ -206,20 +420,152 @@ class InventoryService:
             )
             
             db.session.add(transaction)
-            db.session.commit()
             
-            return {
+            # Build the response before the commit expires the rows
+            db.session.flush()
+            result = {
                 'new_quantity': new_quantity,
                 'transaction_id': transaction.id,
-                'timestamp': transaction.timestamp.isoformat(),
+                'timestamp': transaction.timestamp,
                 'inventory_item': inventory_item.to_dict()
             }
+            if commit and not self._in_bulk:
+                db.session.commit()
+            
+            return result
+            
+        except Exception as e:
+            db.session.rollback()
+            raise e
+    
+    def bulk_update_stock(self, items, reason="Bulk update", commit=True):
+        """
+        Apply many stock changes in one unit of work
+        
+        Each (store, product) pair's deltas are summed and applied in SQL as
+        quantity + delta with a non-negative guard, all in one multi-row
+        upsert; the quantities it returns are then replayed item by item for
+        the per-row stock check and the transaction history, so concurrent
+        writes are never overwritten. All transaction records are inserted in
+        one multi-row INSERT.
+        
+        Args:
+            items (list): Dicts with store_id, product_id, delta and an optional reason
+            reason (str): Default reason for items that do not provide one
+            commit (bool): Commit the change; False (or a bulk() block) leaves it
+                flushed for the caller to commit. A failure still rolls back the
+                whole session.
+            
+        Returns:
+            dict: Result containing per-item new quantities and transaction IDs
+            
+        Raises:
+            ValueError: If insufficient stock or invalid parameters
+        """
+        try:
+            if not items:
+                raise ValueError("At least one item is required")
+            
+            changes = []
+            for item in items:
+                delta = item.get('delta')
+                if not isinstance(delta, int) or isinstance(delta, bool) or delta == 0:
+                    raise ValueError("Delta must be a non-zero integer")
+                changes.append((
+                    (_coerce_id(item['store_id'], "Store ID"), _coerce_id(item['product_id'], "Product ID")),
+                    delta,
+                    item.get('reason') or reason
+                ))
+            
+            store_ids = {store_id for (store_id, _), _, _ in changes}
+            product_ids = {product_id for (_, product_id), _, _ in changes}
+            
+            found_stores = set(db.session.scalars(
+                select(Store.id).where(Store.id.in_(store_ids))
+            ))
+            missing = store_ids - found_stores
+            if missing:
+                raise ValueError(f"Store with ID {min(missing)} not found")
+            
+            found_products = set(db.session.scalars(
+                select(Product.id).where(Product.id.in_(product_ids))
+            ))
+            missing = product_ids - found_products
+            if missing:
+                raise ValueError(f"Product with ID {min(missing)} not found")
+            
+            # Net change per pair, written relative to the current rows
+            net = {}
+            for key, delta, _ in changes:
+                net[key] = net.get(key, 0) + delta
+            written = _upsert_inventory(net)
+            
+            # Starting quantities follow from what the write returned; a pair
+            # the guard refused is read back only to explain the failure. (A
+            # negative net for a pair with no row inserts a negative row; the
+            # replay rejects it and the rollback discards it.)
+            refused = [key for key in net if key not in written]
+            quantities = {key: item.quantity - net[key] for key, item in written.items()}
+            if refused:
+                quantities.update(
+                    ((row.store_id, row.product_id), row.quantity)
+                    for row in db.session.execute(
+                        select(InventoryItem.store_id, InventoryItem.product_id, InventoryItem.quantity)
+                        .where(tuple_(InventoryItem.store_id, InventoryItem.product_id).in_(refused))
+                    )
+                )
+            
+            # Replay the items in order so repeated pairs see each other's changes
+            transaction_rows = []
+            for (store_id, product_id), delta, note in changes:
+                previous_qty = quantities.get((store_id, product_id), 0)
+                new_quantity = previous_qty + delta
+                if new_quantity < 0:
+                    raise ValueError(
+                        f"Insufficient stock for product {product_id} at store {store_id}. "
+                        f"Current: {previous_qty}, Requested: {abs(delta)}"
+                    )
+                quantities[(store_id, product_id)] = new_quantity
+                transaction_rows.append({
+                    'product_id': product_id,
+                    'store_id': store_id,
+                    'type': "IN" if delta > 0 else "OUT",
+                    'quantity': abs(delta),
+                    'note': note,
+                    'user_id': self.user_id,
+                    'previous_quantity': previous_qty,
+                    'new_quantity': new_quantity
+                })
+            
+            inserted = db.session.execute(
+                insert(Transaction).returning(
+                    Transaction.id, Transaction.timestamp, sort_by_parameter_order=True
+                ),
+                transaction_rows
+            ).all()
+            if commit and not self._in_bulk:
+                db.session.commit()
+            
+            return {
+                'items': [
+                    {
+                        'store_id': row['store_id'],
+                        'product_id': row['product_id'],
+                        'new_quantity': row['new_quantity'],
+                        'transaction_id': transaction.id
+                    }
+                    for row, transaction in zip(transaction_rows, inserted)
+                ],
+                # The database stamps each row; report the batch by its last one
+                'timestamp': inserted[-1].timestamp
+            }
             
         except Exception as e:
             db.session.rollback()
             raise e
     
-    def transfer_stock(self, from_store_id, to_store_id, product_id, quantity, reason="Stock transfer"):
+    def transfer_stock(self, from_store_id, to_store_id, product_id, quantity, reason="Stock transfer",
+                       commit=True):
         """
         Transfer stock between stores
         
@@ -229,6 +575,9 @@ class InventoryService:
             product_id (int): Product ID
             quantity (int): Quantity to transfer (must be positive)
             reason (str): Reason for transfer
+            commit (bool): Commit the change; False (or a bulk() block) leaves it
+                flushed for the caller to commit. A failure still rolls back the
+                whole session.
             
         Returns:
             dict: Result containing transaction details for both stores
@@ -237,129 +586,162 @@ class InventoryService:
             ValueError: If insufficient stock or invalid parameters
         """
         try:
-            # Validate inputs
+            # Validate inputs; the probe's rows are keyed by integer IDs
+            from_store_id = _coerce_id(from_store_id, "Source store ID")
+            to_store_id = _coerce_id(to_store_id, "Destination store ID")
+            product_id = _coerce_id(product_id, "Product ID")
             if quantity <= 0:
                 raise ValueError("Transfer quantity must be positive")
             
             if from_store_id == to_store_id:
                 raise ValueError("Cannot transfer to the same store")
             
-            from_store = self.get_store_by_id(from_store_id)
-            to_store = self.get_store_by_id(to_store_id)
-            product = self.get_product_by_id(product_id)
-            
-            if not from_store:
-                raise ValueError(f"Source store with ID {from_store_id} not found")
-            if not to_store:
-                raise ValueError(f"Destination store with ID {to_store_id} not found")
-            if not product:
+            # Both stores, the product and both inventory rows in one
+            # round-trip; the per-entity lookups only explain a missing row
+            rows = {
+                row.Store.id: row
+                for row in db.session.execute(_stock_probe([from_store_id, to_store_id], product_id))
+            }
+            for row in rows.values():
+                self._store_cache[row.Store.id] = row.Store
+                self._product_cache[product_id] = row.Product
+            if len(rows) < 2:
+                if from_store_id not in rows and not self.get_store_by_id(from_store_id):
+                    raise ValueError(f"Source store with ID {from_store_id} not found")
+                if to_store_id not in rows and not self.get_store_by_id(to_store_id):
+                    raise ValueError(f"Destination store with ID {to_store_id} not found")
                 raise ValueError(f"Product with ID {product_id} not found")
-            
-            # Get source inventory item
-            from_inventory = self.get_inventory_item(from_store_id, product_id)
-            if not from_inventory or from_inventory.quantity < quantity:
-                current_qty = from_inventory.quantity if from_inventory else 0
+            from_store = rows[from_store_id].Store
+            to_store = rows[to_store_id].Store
+            
+            # A source without a row has nothing to send; otherwise both rows
+            # are written in one statement whose guard is the stock check (a
+            # refused source update leaves the source out of the result)
+            from_row = rows[from_store_id].InventoryItem
+            current_qty = from_row.quantity if from_row else 0
+            written = {}
+            if from_row is not None:
+                written = _upsert_inventory({
+                    (from_store_id, product_id): -quantity,
+                    (to_store_id, product_id): quantity
+                })
+            from_inventory = written.get((from_store_id, product_id))
+            if from_inventory is None or from_inventory.quantity < 0:
                 raise ValueError(f"Insufficient stock at source store. Current: {current_qty}, Requested: {quantity}")
-            
-            # Get or create destination inventory item
-            to_inventory = self.get_inventory_item(to_store_id, product_id)
-            if not to_inventory:
-                to_inventory = InventoryItem(
-                    store_id=to_store_id,
-                    product_id=product_id,
-                    quantity=0
-                )
-                db.session.add(to_inventory)
-            
-            # Update quantities
-            from_previous_qty = from_inventory.quantity
-            from_inventory.quantity -= quantity
-            from_inventory.last_updated = datetime.now(timezone.utc)
             from_new_qty = from_inventory.quantity
+            from_previous_qty = from_new_qty + quantity
             
-            to_previous_qty = to_inventory.quantity
-            to_inventory.quantity += quantity
-            to_inventory.last_updated = datetime.now(timezone.utc)
+            to_inventory = written[(to_store_id, product_id)]
             to_new_qty = to_inventory.quantity
-            
-            # Create transaction records for both stores
-            out_transaction = Transaction(
-                product_id=product_id,
-                store_id=from_store_id,
-                type="TRANSFER",
-                quantity=quantity,
-                note=f"Transfer OUT to {to_store.name}: {reason}",
-                related_store_id=to_store_id,
-                user_id=self.user_id,
-                previous_quantity=from_previous_qty,
-                new_quantity=from_new_qty
-            )
-            
-            in_transaction = Transaction(
-                product_id=product_id,
-                store_id=to_store_id,
-                type="TRANSFER",
-                quantity=quantity,
-                note=f"Transfer IN from {from_store.name}: {reason}",
-                related_store_id=from_store_id,
-                user_id=self.user_id,
-                previous_quantity=to_previous_qty,
-                new_quantity=to_new_qty
-            )
-            
-            db.session.add(out_transaction)
-            db.session.add(in_transaction)
-            db.session.commit()
-            
-            return {
+            to_previous_qty = to_new_qty - quantity
+            
+            # Both transaction records in one multi-row INSERT ... RETURNING,
+            # stamped by the database
+            out_transaction, in_transaction = db.session.execute(
+                insert(Transaction).returning(
+                    Transaction.id, Transaction.timestamp, sort_by_parameter_order=True
+                ),
+                [
+                    {
+                        'product_id': product_id,
+                        'store_id': from_store_id,
+                        'type': "TRANSFER",
+                        'quantity': quantity,
+                        'note': f"Transfer OUT to {to_store.name}: {reason}",
+                        'related_store_id': to_store_id,
+                        'user_id': self.user_id,
+                        'previous_quantity': from_previous_qty,
+                        'new_quantity': from_new_qty
+                    },
+                    {
+                        'product_id': product_id,
+                        'store_id': to_store_id,
+                        'type': "TRANSFER",
+                        'quantity': quantity,
+                        'note': f"Transfer IN from {from_store.name}: {reason}",
+                        'related_store_id': from_store_id,
+                        'user_id': self.user_id,
+                        'previous_quantity': to_previous_qty,
+                        'new_quantity': to_new_qty
+                    }
+                ]
+            ).all()
+            
+            # Build the response from the rows the writes returned, then
+            # commit both stores' changes as one unit of work
+            result = {
                 'from_store': {
-                    'new_quantity': from_inventory.quantity,
+                    'new_quantity': from_new_qty,
                     'transaction_id': out_transaction.id,
                     'inventory_item': from_inventory.to_dict()
                 },
                 'to_store': {
-                    'new_quantity': to_inventory.quantity,
+                    'new_quantity': to_new_qty,
                     'transaction_id': in_transaction.id,
                     'inventory_item': to_inventory.to_dict()
                 },
-                'timestamp': out_transaction.timestamp.isoformat()
+                'timestamp': out_transaction.timestamp
             }
+            if commit and not self._in_bulk:
+                db.session.commit()
+            
+            return result
             
         except Exception as e:
             db.session.rollback()
             raise e
     
-    def get_low_stock_items(self, store_id=None):
+    def get_low_stock_items(self, store_id=None, limit=None):
         """
-        Get items with stock below reorder level
+        Get items with stock below reorder level, largest shortage first
         
         Args:
             store_id (int, optional): Filter by specific store
+            limit (int, optional): Return only the most urgent items
             
         Returns:
             List[dict]: List of low stock items with details
         """
-        query = db.session.query(InventoryItem, Product).join(Product).filter(
+        # Only the columns to_dict() plus the shortage need, as plain rows:
+        # no ORM objects, identity map or relationship loads. The database
+        # sorts and limits, so only the rows asked for are fetched.
+        shortage = (Product.reorder_level - InventoryItem.quantity).label('shortage')
+        query = _inventory_select().add_columns(shortage).where(
+            InventoryItem.quantity <= Product.reorder_level
+        ).order_by(shortage.desc(), InventoryItem.id)
+        
+        if store_id:
+            query = query.where(InventoryItem.store_id == store_id)
+        if limit is not None:
+            query = query.limit(limit)
+        
+        return _rows_to_dicts(db.session.execute(query).mappings())
+    
+    def get_low_stock_summary(self, store_id=None):
+        """
+        Get low stock items as compact rows for summaries
+        
+        Same filter as get_low_stock_items(), but selects only the four
+        printed columns in one joined query, with no ORM objects or dicts.
+        
+        Args:
+            store_id (int, optional): Filter by specific store
+            
+        Returns:
+            List[LowStock]: (product_name, store_name, quantity, reorder_level) rows
+        """
+        query = select(
+            Product.name, Store.name, InventoryItem.quantity, Product.reorder_level
+        ).join(Store, InventoryItem.store_id == Store.id).join(
+            Product, InventoryItem.product_id == Product.id
+        ).where(
             InventoryItem.quantity <= Product.reorder_level
         )
         
         if store_id:
-            query = query.filter(InventoryItem.store_id == store_id)
-        
-        results = query.all()
-        
-        low_stock_items = []
-        for inventory_item, product in results:
-            item_dict = inventory_item.to_dict()
-            item_dict.update({
-                'product_name': product.name,
-                'product_sku': product.sku,
-                'reorder_level': product.reorder_level,
-                'shortage': product.reorder_level - inventory_item.quantity
-            })
-            low_stock_items.append(item_dict)
-        
-        return low_stock_items
+            query = query.where(InventoryItem.store_id == store_id)
+        
+        return [LowStock._make(row) for row in db.session.execute(query)]
     
     def get_recent_transactions(self, limit=50, store_id=None):
         """
@@ -372,14 +754,55 @@ class InventoryService:
         Returns:
             List[Transaction]: List of recent transactions
         """
-        query = Transaction.query.order_by(Transaction.timestamp.desc())
+        # All four relationships to_dict() reads are many-to-one, so they
+        # join into the same single query (no extra SELECTs, no row fan-out)
+        query = Transaction.query.options(
+            joinedload(Transaction.product),
+            joinedload(Transaction.store),
+            joinedload(Transaction.related_store),
+            joinedload(Transaction.user)
+        ).order_by(Transaction.timestamp.desc(), Transaction.id.desc())
         
         if store_id:
             query = query.filter(Transaction.store_id == store_id)
         
         return query.limit(limit).all()
     
-    def generate_stock_report(self, start_date=None, end_date=None, store_id=None):
+    def iter_transactions_raw(self, limit=None, offset=None, store_id=None,
+                              start_date=None, end_date=None):
+        """
+        Stream transactions, newest first, with related names as plain dicts
+        
+        Args:
+            limit (int, optional): Maximum number of transactions to return
+            offset (int, optional): Number of transactions to skip
+            store_id (int, optional): Filter by specific store
+            start_date (datetime, optional): Only transactions at or after this time
+            end_date (datetime, optional): Only transactions at or before this time
+            
+        Yields:
+            dict: Transaction rows shaped like Transaction.to_dict()
+        """
+        stmt = _transactions_select().order_by(Transaction.timestamp.desc(), Transaction.id.desc())
+        
+        if store_id:
+            stmt = stmt.where(Transaction.store_id == store_id)
+        if start_date:
+            stmt = stmt.where(Transaction.timestamp >= start_date)
+        if end_date:
+            stmt = stmt.where(Transaction.timestamp <= end_date)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        if offset:
+            stmt = stmt.offset(offset)
+        
+        rows = db.session.execute(
+            stmt.execution_options(yield_per=STREAM_BATCH_SIZE)
+        ).mappings()
+        return _iter_dicts(rows)
+    
+    def generate_stock_report(self, start_date=None, end_date=None, store_id=None,
+                              include_transactions=True):
         """
         Generate aggregated stock movement report
         
@@ -387,28 +810,45 @@ class InventoryService:
             start_date (datetime, optional): Start date for report
             end_date (datetime, optional): End date for report
             store_id (int, optional): Filter by specific store
+            include_transactions (bool): Include the period's transactions
             
+        Totals are computed in SQL. total_in and total_out include transfers
+        received and sent, so net_change is the actual change in stock. The
+        transactions are never materialized: 'transactions' is the streaming
+        iterator from iter_transactions_raw(), to be consumed (e.g. written
+        out as a JSON array) while the session is still open.
+        
         Returns:
             dict: Report data with totals and breakdowns
         """
-        # Base query for transactions
-        query = Transaction.query
-        
-        # Apply filters
+        filters = []
         if start_date:
-            query = query.filter(Transaction.timestamp >= start_date)
+            filters.append(Transaction.timestamp >= start_date)
         if end_date:
-            query = query.filter(Transaction.timestamp <= end_date)
+            filters.append(Transaction.timestamp <= end_date)
         if store_id:
-            query = query.filter(Transaction.store_id == store_id)
+            filters.append(Transaction.store_id == store_id)
         
-        transactions = query.all()
+        # Each transfer writes an OUT row at the source and an IN row at the
+        # destination, both typed TRANSFER; the quantity change tells them apart
+        is_transfer = Transaction.type == 'TRANSFER'
+        transfer_in = and_(is_transfer, Transaction.new_quantity > Transaction.previous_quantity)
+        transfer_out = and_(is_transfer, Transaction.new_quantity < Transaction.previous_quantity)
         
-        # Calculate totals
-        total_in = sum(t.quantity for t in transactions if t.type in ['IN', 'TRANSFER'] and t.store_id == store_id)
-        total_out = sum(t.quantity for t in transactions if t.type == 'OUT')
-        total_transfers_in = sum(t.quantity for t in transactions if t.type == 'TRANSFER' and t.store_id == store_id)
-        total_transfers_out = sum(t.quantity for t in transactions if t.type == 'TRANSFER' and t.related_store_id)
+        def quantity_sum(condition):
+            return func.coalesce(func.sum(case((condition, Transaction.quantity), else_=0)), 0)
+        
+        # All four totals in one aggregate query instead of loading every row
+        totals = db.session.execute(
+            select(
+                quantity_sum(Transaction.type == 'IN').label('stock_in'),
+                quantity_sum(Transaction.type == 'OUT').label('stock_out'),
+                quantity_sum(transfer_in).label('transfers_in'),
+                quantity_sum(transfer_out).label('transfers_out')
+            ).where(*filters)
+        ).one()
+        total_in = totals.stock_in + totals.transfers_in
+        total_out = totals.stock_out + totals.transfers_out
         
         # Get current inventory summary
         inventory_query = db.session.query(
@@ -422,19 +862,18 @@ class InventoryService:
         
         inventory_summary = inventory_query.all()
         
-        return {
+        report = {
             'period': {
-                'start_date': start_date.isoformat() if start_date else None,
-                'end_date': end_date.isoformat() if end_date else None
+                'start_date': start_date,
+                'end_date': end_date
             },
             'totals': {
                 'total_in': total_in,
                 'total_out': total_out,
-                'total_transfers_in': total_transfers_in,
-                'total_transfers_out': total_transfers_out,
+                'total_transfers_in': totals.transfers_in,
+                'total_transfers_out': totals.transfers_out,
                 'net_change': total_in - total_out
             },
-            'transactions': [t.to_dict() for t in transactions],
             'inventory_summary': [
                 {
                     'store_id': summary.store_id,
@@ -444,6 +883,13 @@ class InventoryService:
                 for summary in inventory_summary
             ]
         }
+        
+        if include_transactions:
+            report['transactions'] = self.iter_transactions_raw(
+                store_id=store_id, start_date=start_date, end_date=end_date
+            )
+        
+        return report
     
     def get_dashboard_kpis(self):
         """
@@ -452,19 +898,18 @@ class InventoryService:
         Returns:
             dict: KPI data including totals and alerts
         """
-        # Total unique products
-        total_products = Product.query.count()
-        
-        # Total inventory units across all stores
-        total_units = db.session.query(func.sum(InventoryItem.quantity)).scalar() or 0
-        
-        # Low stock count
-        low_stock_count = db.session.query(InventoryItem).join(Product).filter(
-            InventoryItem.quantity <= Product.reorder_level
-        ).count()
-        
-        # Total stores
-        total_stores = Store.query.count()
+        # Product and store counts ride along as scalar subqueries on the
+        # single inventory aggregate pass: one round-trip for all four KPIs
+        total_products, total_units, low_stock_count, total_stores = db.session.execute(
+            select(
+                select(func.count()).select_from(Product).scalar_subquery(),
+                func.coalesce(func.sum(InventoryItem.quantity), 0),
+                func.count(case((InventoryItem.quantity <= Product.reorder_level, 1))),
+                select(func.count()).select_from(Store).scalar_subquery()
+            ).select_from(InventoryItem).outerjoin(
+                Product, InventoryItem.product_id == Product.id
+            )
+        ).one()
         
         # Recent transactions (last 10)
         recent_transactions = self.get_recent_transactions(limit=10)
@@ -7,12 +7,20 @@ Manages client connections and broadcasts inventory changes to connected clients
 
 from flask_socketio import emit, join_room, leave_room, rooms
 from flask import session
+from datetime import datetime, timezone
+from time import monotonic_ns
 import logging
 
+from json_provider import PreEncodedJSON
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Room for clients that want every inventory/transfer/product event (the
+# dashboard and product pages); store pages only join their store's room
+DASHBOARD_ROOM = 'dashboard'
+
 
 def init_socketio_events(socketio):
     """Initialize SocketIO event handlers"""
@@ -74,10 +82,32 @@ def init_socketio_events(socketio):
             'message': f'Left store {store_id} updates'
         })
     
+    @socketio.on('join_dashboard')
+    def handle_join_dashboard():
+        """Join the dashboard room for chain-wide updates"""
+        if 'user_id' not in session:
+            emit('error', {'message': 'Authentication required'})
+            return
+        
+        join_room(DASHBOARD_ROOM)
+        logger.info(f"User {session['username']} joined the dashboard room")
+        emit('joined_dashboard', {'message': 'Joined chain-wide updates'})
+    
+    @socketio.on('leave_dashboard')
+    def handle_leave_dashboard():
+        """Leave the dashboard room"""
+        if 'user_id' not in session:
+            return
+        
+        leave_room(DASHBOARD_ROOM)
+        logger.info(f"User {session['username']} left the dashboard room")
+    
     @socketio.on('ping')
     def handle_ping():
         """Handle ping for connection testing"""
-        emit('pong', {'timestamp': str(datetime.now())})
+        # A liveness probe only needs a cheap, ordered marker; monotonic
+        # nanoseconds skip building and formatting a datetime per ping
+        emit('pong', {'t': monotonic_ns()})
 
 
 def broadcast_inventory_update(socketio, product_id, store_id, new_qty, transaction_id, timestamp):
@@ -90,19 +120,20 @@ def broadcast_inventory_update(socketio, product_id, store_id, new_qty, transact
         store_id (int): Store ID where update occurred
         new_qty (int): New quantity after update
         transaction_id (int): Transaction ID for the update
-        timestamp (str): ISO timestamp of the update
+        timestamp (datetime): UTC time of the update
     """
-    update_data = {
+    # Serialized once for both audiences
+    update_data = PreEncodedJSON({
         'product_id': product_id,
         'store_id': store_id,
         'new_qty': new_qty,
         'transaction_id': transaction_id,
         'timestamp': timestamp,
         'type': 'inventory_update'
-    }
+    })
     
-    # Broadcast to all connected clients
-    socketio.emit('inventory_update', update_data)
+    # Chain-wide subscribers
+    socketio.emit('inventory_update', update_data, room=DASHBOARD_ROOM)
     
     # Also broadcast to store-specific room
     store_room = f"store_{store_id}"
@@ -111,6 +142,41 @@ def broadcast_inventory_update(socketio, product_id, store_id, new_qty, transact
     logger.info(f"Broadcasted inventory update: Product {product_id}, Store {store_id}, Qty {new_qty}")
 
 
+def broadcast_inventory_bulk_update(socketio, items, timestamp):
+    """
+    Broadcast a batch of inventory updates as a single event
+    
+    Args:
+        socketio: SocketIO instance
+        items (list): Dicts with product_id, store_id, new_quantity and transaction_id
+        timestamp (datetime): UTC time of the batch
+    """
+    # Serialized once for every audience
+    update_data = PreEncodedJSON({
+        'items': [
+            {
+                'product_id': item['product_id'],
+                'store_id': item['store_id'],
+                'new_qty': item['new_quantity'],
+                'transaction_id': item['transaction_id'],
+                'timestamp': timestamp
+            }
+            for item in items
+        ],
+        'timestamp': timestamp,
+        'type': 'inventory_bulk_update'
+    })
+    
+    # Chain-wide subscribers
+    socketio.emit('inventory_bulk_update', update_data, room=DASHBOARD_ROOM)
+    
+    # Also broadcast once to each affected store room
+    for store_id in sorted({item['store_id'] for item in items}):
+        socketio.emit('store_inventory_bulk_update', update_data, room=f"store_{store_id}")
+    
+    logger.info(f"Broadcasted bulk inventory update: {len(items)} items")
+
+
 def broadcast_transfer_update(socketio, from_store_id, to_store_id, product_id, quantity, transaction_data, timestamp):
     """
     Broadcast transfer update to connected clients
@@ -122,9 +188,10 @@ def broadcast_transfer_update(socketio, from_store_id, to_store_id, product_id,
         product_id (int): Product ID being transferred
         quantity (int): Quantity transferred
         transaction_data (dict): Transaction details
-        timestamp (str): ISO timestamp of the transfer
+        timestamp (datetime): UTC time of the transfer
     """
-    transfer_data = {
+    # Serialized once for all three audiences
+    transfer_data = PreEncodedJSON({
         'from_store_id': from_store_id,
         'to_store_id': to_store_id,
         'product_id': product_id,
@@ -132,10 +199,10 @@ def broadcast_transfer_update(socketio, from_store_id, to_store_id, product_id,
         'transaction_data': transaction_data,
         'timestamp': timestamp,
         'type': 'transfer_update'
-    }
+    })
     
-    # Broadcast to all connected clients
-    socketio.emit('transfer_update', transfer_data)
+    # Chain-wide subscribers
+    socketio.emit('transfer_update', transfer_data, room=DASHBOARD_ROOM)
     
     # Broadcast to both store-specific rooms
     from_store_room = f"store_{from_store_id}"
@@ -161,12 +228,10 @@ def broadcast_product_update(socketio, product_id, action, product_data=None):
         'product_id': product_id,
         'action': action,
         'product_data': product_data,
-        'timestamp': str(datetime.now()),
+        # Encoded to ISO 8601 (UTC) by the JSON serializer, like the other broadcasts
+        'timestamp': datetime.now(timezone.utc),
         'type': 'product_update'
     }
     
-    socketio.emit('product_update', update_data)
+    socketio.emit('product_update', update_data, room=DASHBOARD_ROOM)
     logger.info(f"Broadcasted product update: Product {product_id}, Action {action}")
-
-
-from datetime import datetime
\ No newline at end of file
@@ -1,15 +1,17 @@
 import sys, os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from app import app
+from sqlalchemy import select
 from models import db, User
 
 with app.app_context():
-    users = User.query.all()
+    # Only the three printed columns, as plain rows rather than User objects
+    rows = db.session.execute(select(User.username, User.role, User.permissions)).all()
     print("\n" + "="*60)
     print("USER PERMISSIONS")
     print("="*60)
-    for user in users:
-        perms = user.get_permissions()
-        print(f"\n{user.username} ({user.role}):")
+    for username, role, permissions in rows:
+        perms = User.parse_permissions(permissions)
+        print(f"\n{username} ({role}):")
         print(f"  Permissions: {', '.join(perms)}")
     print("\n" + "="*60 + "\n")
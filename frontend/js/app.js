@@ -14,6 +14,9 @@ const config = {
 let socket = null;
 let currentUser = null;
 let isAuthenticated = false;
+// Socket rooms to (re)join on every connect
+let dashboardSubscribed = false;
+let joinedStoreId = null;
 
 /**
  * Utility Functions
@@ -109,6 +112,11 @@ class Utils {
     try {
       const response = await fetch(url, finalOptions);
 
+      // Not modified: nothing new to report
+      if (response.status === 304) {
+        return null;
+      }
+
       if (!response.ok) {
         const errorData = await response.json().catch(() => ({}));
         throw new Error(
@@ -260,6 +268,14 @@ class WebSocketManager {
         console.log("Socket connected:", socket.id);
         this.updateConnectionStatus(true);
         Utils.showMessage("Real-time connection established", "success");
+
+        // Rooms do not survive a reconnect, so subscribe again
+        if (dashboardSubscribed) {
+          socket.emit("join_dashboard");
+        }
+        if (joinedStoreId) {
+          socket.emit("join_store", { store_id: joinedStoreId });
+        }
       });
 
       socket.on("disconnect", (reason) => {
@@ -273,19 +289,50 @@ class WebSocketManager {
         this.updateConnectionStatus(false);
       });
 
-      // Global event handlers
-      socket.on("inventory_update", (data) => {
-        console.log("Inventory update received:", data);
+      // Chain-wide events (dashboard room) and the same events for a
+      // joined store room both feed the page-level DOM events
+      const dispatchInventory = (data) => {
         window.dispatchEvent(
           new CustomEvent("inventoryUpdate", { detail: data })
         );
+      };
+      const dispatchBulkInventory = (data) => {
+        data.items.forEach(dispatchInventory);
+      };
+      const dispatchTransfer = (data) => {
+        window.dispatchEvent(
+          new CustomEvent("transferUpdate", { detail: data })
+        );
+      };
+
+      socket.on("store_inventory_update", (data) => {
+        console.log("Store inventory update received:", data);
+        dispatchInventory(data);
+      });
+
+      socket.on("store_inventory_bulk_update", (data) => {
+        console.log("Store bulk inventory update received:", data);
+        dispatchBulkInventory(data);
+      });
+
+      socket.on("store_transfer_update", (data) => {
+        console.log("Store transfer update received:", data);
+        dispatchTransfer(data);
+      });
+
+      socket.on("inventory_update", (data) => {
+        console.log("Inventory update received:", data);
+        dispatchInventory(data);
+      });
+
+      socket.on("inventory_bulk_update", (data) => {
+        console.log("Bulk inventory update received:", data);
+        dispatchBulkInventory(data);
       });
 
       socket.on("transfer_update", (data) => {
         console.log("Transfer update received:", data);
-        window.dispatchEvent(
-          new CustomEvent("transferUpdate", { detail: data })
-        );
+        dispatchTransfer(data);
       });
 
       socket.on("product_update", (data) => {
@@ -315,13 +362,25 @@ class WebSocketManager {
     });
   }
 
+  static joinDashboardRoom() {
+    // Chain-wide inventory, transfer and product events
+    dashboardSubscribed = true;
+    if (socket && socket.connected) {
+      socket.emit("join_dashboard");
+    }
+  }
+
   static joinStoreRoom(storeId) {
+    joinedStoreId = storeId;
     if (socket && socket.connected) {
       socket.emit("join_store", { store_id: storeId });
     }
   }
 
   static leaveStoreRoom(storeId) {
+    if (joinedStoreId === storeId) {
+      joinedStoreId = null;
+    }
     if (socket && socket.connected) {
       socket.emit("leave_store", { store_id: storeId });
     }
@@ -10,6 +10,7 @@ class Dashboard {
     this.lowStockData = [];
     this.pollInterval = null;
     this.lastUpdateTime = new Date().toISOString();
+    this.lastUpdateId = null;
 
     this.init();
   }
@@ -20,6 +21,9 @@ class Dashboard {
     // Setup event listeners
     this.setupEventListeners();
 
+    // Subscribe to chain-wide real-time updates
+    WebSocketManager.joinDashboardRoom();
+
     // Load initial data
     await this.loadDashboardData();
 
@@ -70,7 +74,8 @@ class Dashboard {
 
   async loadLowStockAlerts() {
     try {
-      this.lowStockData = await Utils.apiCall("/reports/low-stock");
+      // Only the six most urgent alerts are shown
+      this.lowStockData = await Utils.apiCall("/reports/low-stock?limit=6");
       this.updateLowStockDisplay();
     } catch (error) {
       console.error("Failed to load low stock alerts:", error);
@@ -337,14 +342,26 @@ class Dashboard {
     this.pollInterval = setInterval(async () => {
       if (!window.socket || !window.socket.connected) {
         try {
-          const changes = await Utils.apiCall(
-            `/changes?since=${this.lastUpdateTime}`
-          );
-          if (changes.changes && changes.changes.length > 0) {
+          // Page through everything after the cursor, then refresh once
+          let found = false;
+          let changes;
+          do {
+            const cursor =
+              this.lastUpdateId == null ? "" : `&since_id=${this.lastUpdateId}`;
+            changes = await Utils.apiCall(
+              `/changes?since=${this.lastUpdateTime}${cursor}`
+            );
+            // null means 304 Not Modified: keep the current cursor
+            if (changes) {
+              found = found || (changes.changes && changes.changes.length > 0);
+              this.lastUpdateTime = changes.timestamp;
+              this.lastUpdateId = changes.since_id;
+            }
+          } while (changes && changes.has_more);
+          if (found) {
             console.log("Polling: Found changes, refreshing dashboard");
             await this.refreshData();
           }
-          this.lastUpdateTime = changes.timestamp;
         } catch (error) {
           console.error("Polling failed:", error);
         }
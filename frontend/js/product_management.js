@@ -17,6 +17,9 @@ class ProductManagement {
     // Setup event listeners
     this.setupEventListeners();
 
+    // Subscribe to chain-wide real-time updates
+    WebSocketManager.joinDashboardRoom();
+
     // Load products
     await this.loadProducts();
 